@@ -8,9 +8,259 @@ except (ImportError, KeyError):
 
 import streamlit as st
 import os
+import json
+import time
+from datetime import datetime
 from src.components.sidebar import render_sidebar
-from src.components.researcher import create_researcher, create_research_task, run_research
-from src.utils.output_handler import capture_output
+from src.components.researcher import create_researcher, create_research_task, run_research, run_refresh
+from src.components.history import render_report_history
+from src.components.router import resolve_route
+from src.components.tools import get_coalescing_stats
+from src.utils.artifact_store import get_artifact_store
+from src.utils.background_run import BackgroundRun
+from src.utils.report_history import extract_urls, get_report_history
+from src.utils.source_check import revalidate_sources
+
+#--------------------------------#
+#        Config Validation       #
+#--------------------------------#
+def get_config_warning(selection):
+    """Return a message describing what's missing from the configuration, or None."""
+    # Safety check: ensure selection is a valid dictionary
+    if not selection or not isinstance(selection, dict):
+        return "⚠️ Configuration error. Please refresh the page."
+
+    # Check if API keys are set based on provider
+    if selection.get("provider") == "OpenAI" or selection.get("manager_provider") == "OpenAI":
+        if not os.environ.get("OPENAI_API_KEY"):
+            return "⚠️ Please enter your OpenAI API key in the sidebar to get started"
+    elif selection.get("provider") == "GROQ" or selection.get("manager_provider") == "GROQ":
+        if not os.environ.get("GROQ_API_KEY"):
+            return "⚠️ Please enter your GROQ API key in the sidebar to get started"
+
+    # Check EXA key for non-Ollama providers
+    provider = selection.get("provider") or selection.get("manager_provider")
+    if provider and provider != "Ollama":
+        if not os.environ.get("EXA_API_KEY"):
+            return "⚠️ Please enter your EXA API key in the sidebar to get started"
+
+    # Add Ollama check
+    model = selection.get("model") or selection.get("manager_model")
+    if provider == "Ollama" and not model:
+        return "⚠️ No Ollama models found. Please make sure Ollama is running and you have models loaded."
+
+    return None
+
+#--------------------------------#
+#           Research Job         #
+#--------------------------------#
+def research_job(selection, task_description):
+    """Route, run the crew and persist its outputs. Executes on a background thread."""
+    decision = resolve_route(selection, task_description)
+    if decision["automatic"]:
+        print(f"Routing: {decision['route']} (score {decision['score']}: {', '.join(decision['signals']) or 'no complexity signals'})")
+
+    run_config = {**selection, "route": decision["route"]}
+    researcher = create_researcher(run_config)
+    task = create_research_task(researcher, task_description)
+    start = time.perf_counter()
+    result = run_research(researcher, task)
+    elapsed_s = time.perf_counter() - start
+
+    # Persist and index the report and task outputs, then apply retention
+    store = get_artifact_store()
+    history = get_report_history()
+    run_id = store.save_run(task_description, run_config, result)
+    history.add_run(run_id, task_description, str(result), selection)
+    token_usage = getattr(result, "token_usage", None)
+    history.add_run_metrics(run_id, decision, elapsed_s, getattr(token_usage, "total_tokens", None))
+    history.remove_runs(store.cleanup())
+    return run_id
+
+def refresh_job(selection, prior_run_id):
+    """Refresh a stored report with only new or changed material. Executes on a background thread."""
+    store = get_artifact_store()
+    manifest = store.get_manifest(prior_run_id)
+    if not manifest:
+        raise FileNotFoundError(f"Run {prior_run_id} is no longer stored")
+    query = manifest["query"]
+    prior_report = store.read_artifact(prior_run_id)
+    validators = {}
+    if "sources.json" in manifest["artifacts"]:
+        validators = json.loads(store.read_artifact(prior_run_id, "sources.json"))
+
+    # Re-validate cited URLs with conditional requests before spending any tokens
+    urls = extract_urls(prior_report)
+    print(f"Re-validating {len(urls)} cited sources...")
+    source_checks = revalidate_sources(urls, manifest["created_at"], validators)
+    counts = {}
+    for check in source_checks:
+        counts[check["status"]] = counts.get(check["status"], 0) + 1
+    print("Source check: " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+
+    since_label = datetime.fromtimestamp(manifest["created_at"]).strftime("%B %d, %Y")
+    result = run_refresh(selection, query, prior_report, source_checks, since_label)
+
+    history = get_report_history()
+    run_id = store.save_run(
+        query,
+        selection,
+        result,
+        extra_artifacts={"sources.json": json.dumps({c["url"]: c for c in source_checks})},
+        parent_run_id=prior_run_id
+    )
+    history.add_run(run_id, query, str(result), selection)
+    history.remove_runs(store.cleanup())
+    return run_id
+
+#--------------------------------#
+#           Fragments            #
+#--------------------------------#
+@st.fragment
+def sidebar_config():
+    """Sidebar configuration, memoized in session state.
+
+    Widget changes rerun only the sidebar. The full app reruns only when the
+    resulting config or its validation actually changes.
+    """
+    selection = render_sidebar()
+    warning = get_config_warning(selection)
+    if (selection, warning) != (st.session_state.get("selection"), st.session_state.get("config_warning")):
+        first_render = "selection" not in st.session_state
+        st.session_state["selection"] = selection
+        st.session_state["config_warning"] = warning
+        if not first_render:
+            st.rerun()
+
+@st.fragment
+def run_launcher():
+    """Query input and start button. Starting a run doesn't block the app."""
+    warning = st.session_state.get("config_warning")
+    if warning:
+        st.warning(warning)
+        # Past reports stay searchable without API keys
+        with st.columns([1, 3, 1])[1]:
+            render_report_history()
+        return
+
+    active_run = st.session_state.get("active_run")
+    running = active_run is not None and not active_run.done
+
+    # Create two columns for the input section
+    input_col1, input_col2, input_col3 = st.columns([1, 3, 1])
+    with input_col2:
+        task_description = st.text_area(
+            "What would you like to research?",
+            value="Research the latest AI Agent news in February 2025 and summarize each.",
+            height=68
+        )
+
+        # Check past research before launching a new run
+        render_report_history()
+
+    col1, col2, col3 = st.columns([1, 0.5, 1])
+    with col2:
+        start_research = st.button("🚀 Start Research", use_container_width=False, type="primary", disabled=running)
+
+    if start_research:
+        st.session_state["active_run"] = BackgroundRun(
+            research_job, st.session_state["selection"], task_description
+        ).start()
+        # Full rerun so the progress panel starts polling
+        st.rerun()
+
+def live_progress():
+    """Live log of the active run, polled once a second until it finishes."""
+    active_run = st.session_state.get("active_run")
+    if active_run is None:
+        return
+
+    if not active_run.done:
+        with st.status(f"🤖 Researching... ({active_run.elapsed_s:.0f}s)", expanded=True):
+            # Create persistent container for process output with fixed height.
+            process_container = st.container(height=300, border=True)
+            process_container.text(active_run.output_text)
+            st.caption("Server totals since startup, all sessions: " + " · ".join(
+                f"{s['name']}: {s['executions']} requests, {s['coalesced']} duplicates coalesced"
+                for s in get_coalescing_stats()
+            ))
+        return
+
+    # Run finished: hand the result to the viewer and stop polling
+    st.session_state.pop("active_run")
+    if active_run.state == "complete":
+        st.session_state["last_run_id"] = active_run.result
+    else:
+        st.session_state["last_run_error"] = str(active_run.error)
+    st.rerun()
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def load_report(run_id):
+    """Report text for a run, cached across reruns; a run's artifacts never change."""
+    return get_artifact_store().read_artifact(run_id)
+
+@st.fragment
+def result_viewer():
+    """Final report and download, read from the artifact store on demand."""
+    error = st.session_state.pop("last_run_error", None)
+    if error:
+        st.error(f"An error occurred: {error}")
+
+    # Only the run id is kept in the session; the report is read back from the store
+    run_id = st.session_state.get("last_run_id")
+    store = get_artifact_store()
+    if run_id and not store.get_manifest(run_id):
+        # Removed by retention cleanup
+        st.session_state.pop("last_run_id")
+        run_id = None
+    if not run_id:
+        return
+
+    # Refresh re-validates sources and merges only new material into this report
+    active_run = st.session_state.get("active_run")
+    running = active_run is not None and not active_run.done
+    if st.button(
+        "🔄 Refresh Report",
+        disabled=running or bool(st.session_state.get("config_warning")),
+        help="Re-check cited sources and add only what's new since this report"
+    ):
+        st.session_state["active_run"] = BackgroundRun(
+            refresh_job, st.session_state["selection"], run_id
+        ).start()
+        # Full rerun so the progress panel starts polling
+        st.rerun()
+
+    # Routing decision and what it saved against the full hierarchy
+    metrics = get_report_history().get_run_metrics(run_id)
+    if metrics:
+        caption = f"🧭 {metrics['route'].title()} crew{' (automatic)' if metrics['automatic'] else ''} · {metrics['elapsed_s']:.0f}s"
+        if metrics["total_tokens"]:
+            caption += f" · {metrics['total_tokens']:,} tokens"
+        if metrics["baseline_elapsed_s"] is not None:
+            caption += f" · saved ~{metrics['baseline_elapsed_s'] - metrics['elapsed_s']:.0f}s"
+            if metrics["baseline_tokens"] and metrics["total_tokens"]:
+                caption += f" and ~{metrics['baseline_tokens'] - metrics['total_tokens']:,.0f} tokens"
+            caption += " vs. the average hierarchical run"
+        st.caption(caption)
+
+    # Display the final result
+    report = load_report(run_id)
+    st.markdown(report)
+
+    # Create download buttons
+    st.divider()
+    download_col1, download_col2, download_col3 = st.columns([1, 2, 1])
+    with download_col2:
+        st.markdown("### 📥 Download Research Report")
+
+        # Download as Markdown, reusing the cached report text
+        st.download_button(
+            label="Download Report",
+            data=report,
+            file_name=f"research_report_{run_id}.md",
+            mime="text/markdown",
+            help="Download the research report in Markdown format"
+        )
 
 #--------------------------------#
 #         Streamlit App          #
@@ -35,88 +285,17 @@ col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
     st.title("🔍 :red[CrewAI] Research Assistant", anchor=False)
 
-# Render sidebar and get selection (provider and model)
-selection = render_sidebar()
-
-# Safety check: ensure selection is a valid dictionary
-if not selection or not isinstance(selection, dict):
-    st.error("⚠️ Configuration error. Please refresh the page.")
-    st.stop()
-
-# Check if API keys are set based on provider
-if selection.get("provider") == "OpenAI" or selection.get("manager_provider") == "OpenAI":
-    if not os.environ.get("OPENAI_API_KEY"):
-        st.warning("⚠️ Please enter your OpenAI API key in the sidebar to get started")
-        st.stop()
-elif selection.get("provider") == "GROQ" or selection.get("manager_provider") == "GROQ":
-    if not os.environ.get("GROQ_API_KEY"):
-        st.warning("⚠️ Please enter your GROQ API key in the sidebar to get started")
-        st.stop()
-
-# Check EXA key for non-Ollama providers
-provider = selection.get("provider") or selection.get("manager_provider")
-if provider and provider != "Ollama":
-    if not os.environ.get("EXA_API_KEY"):
-        st.warning("⚠️ Please enter your EXA API key in the sidebar to get started")
-        st.stop()
-
-# Add Ollama check
-model = selection.get("model") or selection.get("manager_model")
-if provider == "Ollama" and not model:
-    st.warning("⚠️ No Ollama models found. Please make sure Ollama is running and you have models loaded.")
-    st.stop()
-
-# Create two columns for the input section
-input_col1, input_col2, input_col3 = st.columns([1, 3, 1])
-with input_col2:
-    task_description = st.text_area(
-        "What would you like to research?",
-        value="Research the latest AI Agent news in February 2025 and summarize each.",
-        height=68
-    )
+# Render sidebar and store the selection (provider and model) in session state
+with st.sidebar:
+    sidebar_config()
 
-col1, col2, col3 = st.columns([1, 0.5, 1])
-with col2:
-    start_research = st.button("🚀 Start Research", use_container_width=False, type="primary")
+run_launcher()
 
-if start_research:
-    with st.status("🤖 Researching...", expanded=True) as status:
-        try:
-            # Create persistent container for process output with fixed height.
-            process_container = st.container(height=300, border=True)
-            output_container = process_container.container()
-
-            # Single output capture context.
-            with capture_output(output_container):
-                researcher = create_researcher(selection)
-                task = create_research_task(researcher, task_description)
-                result = run_research(researcher, task)
-                status.update(label="✅ Research completed!", state="complete", expanded=False)
-        except Exception as e:
-            status.update(label="❌ Error occurred", state="error")
-            st.error(f"An error occurred: {str(e)}")
-            st.stop()
-
-    # Convert CrewOutput to string for display and download
-    result_text = str(result)
+# Poll only while a run is in progress
+active_run = st.session_state.get("active_run")
+st.fragment(live_progress, run_every=1 if active_run is not None else None)()
 
-    # Display the final result
-    st.markdown(result_text)
-
-    # Create download buttons
-    st.divider()
-    download_col1, download_col2, download_col3 = st.columns([1, 2, 1])
-    with download_col2:
-        st.markdown("### 📥 Download Research Report")
-
-        # Download as Markdown
-        st.download_button(
-            label="Download Report",
-            data=result_text,
-            file_name="research_report.md",
-            mime="text/markdown",
-            help="Download the research report in Markdown format"
-        )
+result_viewer()
 
 # Add footer
 st.divider()
@@ -0,0 +1,10 @@
+import streamlit as st
+from src.components.diagnostics import render_diagnostics
+
+st.set_page_config(
+    page_title="Diagnostics · CrewAI Research Assistant",
+    page_icon="🩺",
+    layout="wide"
+)
+
+render_diagnostics()
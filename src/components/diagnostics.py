@@ -0,0 +1,77 @@
+import json
+import streamlit as st
+from src.components.tools import get_coalescing_stats
+from src.utils.memory_profiler import get_memory_report
+from src.utils.report_history import get_report_history
+
+#--------------------------------#
+#          Diagnostics           #
+#--------------------------------#
+def render_diagnostics():
+    """Render memory profiles, retained objects and outbound traffic stats."""
+    st.title("🩺 Diagnostics", anchor=False)
+
+    report = get_memory_report()
+    if not report["enabled"]:
+        st.info(
+            "Memory profiling is off. Start the server with `MEMORY_PROFILING=1` to record "
+            "tracemalloc snapshots around each research run and track objects per session. "
+            "Set `MEMORY_PROFILE_DUMP=path.json` to also write the report after every run."
+        )
+        # Reports expose session ids and server file paths, so show nothing unless opted in
+        st.stop()
+
+    # MEMORY
+    st.subheader("🧠 Memory")
+    mem_col1, mem_col2, mem_col3 = st.columns(3)
+    mem_col1.metric("Traced now", f"{report['traced_current_mb']} MB")
+    mem_col2.metric("Traced peak", f"{report['traced_peak_mb']} MB")
+    mem_col3.metric("Tracked objects", report["tracked_objects"])
+
+    if report["runs"]:
+        runs = list(reversed(report["runs"]))
+        if any(run["overlapped"] for run in runs):
+            st.caption("Overlapped runs shared tracemalloc with another run; their peak and net numbers are upper bounds.")
+        st.dataframe(
+            [{k: v for k, v in run.items() if k != "top_allocations"} for run in runs],
+            use_container_width=True
+        )
+        selected = st.selectbox(
+            "Top allocation sites for run",
+            range(len(runs)),
+            format_func=lambda i: f"{runs[i]['run']} · peak {runs[i]['peak_mb']} MB"
+        )
+        st.dataframe(runs[selected]["top_allocations"], use_container_width=True)
+    else:
+        st.caption("No profiled runs yet.")
+
+    # LEAKS
+    st.subheader("🕳️ Retained After Session End")
+    if report["retained"]:
+        st.warning(f"{len(report['retained'])} objects outlived their session")
+        st.dataframe(report["retained"], use_container_width=True)
+    else:
+        st.success("No tracked objects outlived their session")
+    if report["unattributed_objects"]:
+        st.caption(
+            f"{report['unattributed_objects']} tracked objects were created outside a Streamlit "
+            "session and aren't checked"
+        )
+
+    # OUTBOUND TRAFFIC & ROUTING
+    st.subheader("📡 Outbound Requests")
+    st.dataframe(get_coalescing_stats(), use_container_width=True)
+
+    savings = get_report_history().get_routing_savings()
+    if savings["decisions"]:
+        st.caption(
+            f"🧭 Automatic routing saved ~{savings['elapsed_s_saved']:.0f}s and "
+            f"~{savings['tokens_saved'] or 0:,.0f} tokens over {savings['decisions']} runs"
+        )
+
+    st.download_button(
+        "Download JSON",
+        data=json.dumps(report, indent=2),
+        file_name="diagnostics.json",
+        mime="application/json"
+    )
@@ -0,0 +1,60 @@
+import streamlit as st
+from datetime import datetime
+from src.utils.report_history import get_report_history
+
+PAGE_SIZE = 10
+
+#--------------------------------#
+#         Report History         #
+#--------------------------------#
+@st.fragment
+def render_report_history():
+    """Render a searchable, paginated list of past research runs.
+
+    Runs as a fragment, so searching and paging rerun only this panel. Only
+    one page of run metadata and snippets is fetched per render. A report body
+    is loaded from the artifact store only when the user opens it, by making
+    it the session's current result.
+    """
+    with st.expander("📚 Search Past Research", expanded=False):
+        search = st.text_input(
+            "Search queries, reports and cited URLs",
+            key="history_search",
+            placeholder="e.g. AI agents, arxiv.org"
+        )
+
+        # Reset to the first page whenever the search changes
+        if st.session_state.get("history_last_search") != search:
+            st.session_state["history_last_search"] = search
+            st.session_state["history_page"] = 0
+        page = st.session_state.get("history_page", 0)
+
+        rows, has_more = get_report_history().search(search, page=page, page_size=PAGE_SIZE)
+        if not rows:
+            st.caption("No matching reports." if search else "No past research yet.")
+            return
+
+        for row in rows:
+            created = datetime.fromtimestamp(row["created_at"]).strftime("%Y-%m-%d %H:%M")
+            row_col1, row_col2 = st.columns([5, 1])
+            with row_col1:
+                st.markdown(f"**{row['query']}**  \n{created} · {row['provider'] or 'Unknown'} {row['model'] or ''}")
+                if row["snippet"]:
+                    st.caption(row["snippet"])
+            with row_col2:
+                if st.button("Open", key=f"history_open_{row['run_id']}"):
+                    st.session_state["last_run_id"] = row["run_id"]
+                    # Full rerun so the result viewer picks up the new run
+                    st.rerun()
+
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            if st.button("← Previous", disabled=page == 0, key="history_prev"):
+                st.session_state["history_page"] = page - 1
+                st.rerun(scope="fragment")
+        with page_col:
+            st.caption(f"Page {page + 1}")
+        with next_col:
+            if st.button("Next →", disabled=not has_more, key="history_next"):
+                st.session_state["history_page"] = page + 1
+                st.rerun(scope="fragment")
@@ -1,20 +1,24 @@
 from typing import Type
 from crewai import Agent, Task, Crew, Process, LLM
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool
 from langchain_community.chat_models import ChatZhipuAI
 import streamlit as st
 import os
+from src.components.tools import CoalescedSerperDevTool, CoalescedScrapeWebsiteTool
+from src.utils.cassette import cassette_from_env
+from src.utils.memory_profiler import profiled, track_objects
+from src.utils.ollama import get_ollama_base_url
 
 #--------------------------------#
 #         LLM Creation           #
 #--------------------------------#
-def create_llm(provider, model, mode="worker"):
+def create_llm(provider, model, mode="worker", ollama_options=None):
     """Create LLM instance based on provider and model.
     
     Args:
         provider: Provider name ("OpenAI", "Anthropic (Claude)", etc.)
         model: Model identifier
         mode: "manager" or "worker" for API key selection
+        ollama_options: keep_alive/num_ctx/num_thread passed through to Ollama
     
     Returns:
         LLM or ChatModel instance
@@ -57,9 +61,10 @@ def create_llm(provider, model, mode="worker"):
     
     else:  # Ollama
         return LLM(
-            base_url="http://localhost:11434",
+            base_url=get_ollama_base_url(),
             model=f"ollama/{model}",
-            temperature=0.7
+            temperature=0.7,
+            **(ollama_options or {})
         )
 
 #--------------------------------#
@@ -77,7 +82,8 @@ def create_manager_agent(config):
     manager_llm = create_llm(
         config["manager_provider"],
         config["manager_model"],
-        mode="manager"
+        mode="manager",
+        ollama_options=config.get("ollama_options")
     )
     
     manager = Agent(
@@ -115,12 +121,13 @@ def create_worker_agents(config):
     worker_llm = create_llm(
         config["worker_provider"],
         config["worker_model"],
-        mode="worker"
+        mode="worker",
+        ollama_options=config.get("ollama_options")
     )
     
-    # Built-in tools for all workers
-    search_tool = SerperDevTool()
-    scrape_tool = ScrapeWebsiteTool()
+    # Built-in tools for all workers (identical in-flight requests are coalesced)
+    search_tool = CoalescedSerperDevTool()
+    scrape_tool = CoalescedScrapeWebsiteTool()
     
     # Web Research Specialist
     web_researcher = Agent(
@@ -257,14 +264,17 @@ def create_single_agent(config):
     Returns:
         Agent: Single research agent
     """
+    # Worker config matches the single-agent sidebar choice in sequential mode and,
+    # on the automatic route, keeps the lookup on the worker model and key
     llm = create_llm(
-        config["manager_provider"],  # Use manager config for single agent
-        config["manager_model"],
-        mode="worker"
+        config["worker_provider"],
+        config["worker_model"],
+        mode="worker",
+        ollama_options=config.get("ollama_options")
     )
     
-    search_tool = SerperDevTool()
-    scrape_tool = ScrapeWebsiteTool()
+    search_tool = CoalescedSerperDevTool()
+    scrape_tool = CoalescedScrapeWebsiteTool()
     
     researcher = Agent(
         role='Research Analyst',
@@ -278,19 +288,7 @@ def create_single_agent(config):
     
     return researcher
 
-def create_single_task(agent, task_description):
-    """Create single task for sequential mode.
-    
-    Args:
-        agent: Research agent
-        task_description: User's research query
-    
-    Returns:
-        Task: Research task
-    """
-    return Task(
-        description=task_description,
-        expected_output="""A comprehensive research report for the year 2026. 
+REPORT_EXPECTED_OUTPUT = """A comprehensive research report for the year 2026. 
         Format in clean markdown with:
         
         # Executive Summary
@@ -309,29 +307,71 @@ def create_single_task(agent, task_description):
         Strategic suggestions and action items
         
         # Citations
-        All sources with URLs and dates""",
-        agent=agent,
-        output_file="output/research_report.md"
+        All sources with URLs and dates"""
+
+def create_single_task(agent, task_description):
+    """Create single task for sequential mode.
+    
+    Args:
+        agent: Research agent
+        task_description: User's research query
+    
+    Returns:
+        Task: Research task
+    """
+    return Task(
+        description=task_description,
+        expected_output=REPORT_EXPECTED_OUTPUT,
+        agent=agent
     )
 
+#--------------------------------#
+#          Reduced Mode          #
+#--------------------------------#
+def create_reduced_tasks(agents, task_description):
+    """Create a two-step research-then-report pipeline without a manager.
+    
+    Args:
+        agents: List of worker agents [web_researcher, data_analyst, fact_checker]
+        task_description: User's research query
+    
+    Returns:
+        list: [research_task, report_task]
+    """
+    web_researcher, data_analyst, _ = agents
+    research_task = create_research_tasks(agents, task_description)[0]
+    
+    report_task = Task(
+        description=f"""Using the web research findings, analyze and write the final report on: {task_description}
+        
+        Highlight major trends, key metrics and implications, and keep every source citation.""",
+        expected_output=REPORT_EXPECTED_OUTPUT,
+        agent=data_analyst,
+        context=[research_task]
+    )
+    
+    return [research_task, report_task]
+
 #--------------------------------#
 #         Crew Execution         #
 #--------------------------------#
-def run_research(researcher_or_config, task_or_description):
-    """Execute research using configured agents and process.
+def create_crew(config, task_description):
+    """Build the crew for the configured topology.
+    
+    The topology comes from config["route"] ("sequential", "reduced" or
+    "hierarchical", see router.resolve_route); without one, use_hierarchical
+    decides between the full hierarchy and a single agent.
     
     Args:
         config: Configuration dict from sidebar
         task_description: User's research query
     
     Returns:
-        str: Research results
+        Crew: Crew ready for kickoff
     """
-    # Handle both calling patterns: run_research(config, task_desc) or run_research(researcher, task)
-    config = researcher_or_config
-    task_description = task_or_description
+    route = config.get("route") or ("hierarchical" if config["use_hierarchical"] else "sequential")
     
-    if config["use_hierarchical"]:
+    if route == "hierarchical":
         # HIERARCHICAL MODE: Manager + Workers
         manager = create_manager_agent(config)
         workers = create_worker_agents(config)
@@ -345,6 +385,17 @@ def run_research(researcher_or_config, task_or_description):
             verbose=True,
             planning=True  # Enable automatic planning
         )
+    elif route == "reduced":
+        # REDUCED MODE: Researcher + Analyst, no manager or planning
+        workers = create_worker_agents(config)
+        tasks = create_reduced_tasks(workers, task_description)
+        
+        crew = Crew(
+            agents=workers[:2],
+            tasks=tasks,
+            verbose=True,
+            process=Process.sequential
+        )
     else:
         # SEQUENTIAL MODE: Single Agent
         agent = create_single_agent(config)
@@ -357,7 +408,161 @@ def run_research(researcher_or_config, task_or_description):
             process=Process.sequential
         )
     
-    return crew.kickoff()
+    return crew
+
+@profiled("run_research")
+def run_research(researcher_or_config, task_or_description):
+    """Execute research using configured agents and process.
+    
+    Args:
+        config: Configuration dict from sidebar
+        task_description: User's research query
+    
+    Returns:
+        str: Research results
+    """
+    # Handle both calling patterns: run_research(config, task_desc) or run_research(researcher, task)
+    config = researcher_or_config
+    task_description = task_or_description
+    
+    # Optional record/replay of all LLM and tool calls (CREW_CASSETTE_MODE).
+    # Entered before the crew is built so replay's offline settings cover the whole run.
+    with cassette_from_env(task_description, config):
+        crew = create_crew(config, task_description)
+        
+        # Crew and agents should be collectable once the session ends (MEMORY_PROFILING)
+        track_objects(crew, crew.manager_agent, *crew.agents)
+        
+        return crew.kickoff()
+
+#--------------------------------#
+#       Incremental Refresh      #
+#--------------------------------#
+def _format_urls(checks, status):
+    urls = [c["url"] for c in checks if c["status"] == status]
+    return "\n".join(f"        - {url}" for url in urls) or "        (none)"
+
+def create_refresh_tasks(researcher, editor, query, prior_report, source_checks, since_label):
+    """Create delta-research and merge tasks for refreshing a prior report.
+    
+    Args:
+        researcher: Web research agent that gathers only new material
+        editor: Agent that merges the delta into the prior report
+        query: Original research query
+        prior_report: Markdown of the report being refreshed
+        source_checks: Results of revalidate_sources for the cited URLs
+        since_label: Human-readable date of the prior report
+    
+    Returns:
+        list: [delta_task, merge_task]
+    """
+    # Only the URL lists go to the researcher; the full prior report is needed by the editor alone
+    delta_task = Task(
+        description=f"""Update earlier research on: {query}
+        
+        The existing report was written on {since_label}. Find only what is NEW or CHANGED since then.
+        
+        Cited sources that changed since the report (re-scrape these):
+{_format_urls(source_checks, "changed")}
+        
+        Cited sources whose status couldn't be confirmed (scrape only if central to the topic):
+{_format_urls(source_checks, "unknown")}
+        
+        Cited sources that couldn't be checked (errors or timeouts; scrape only if central to the topic):
+{_format_urls(source_checks, "error")}
+        
+        Cited sources that are unchanged (do NOT re-scrape):
+{_format_urls(source_checks, "unchanged")}
+        
+        Cited sources that no longer exist:
+{_format_urls(source_checks, "gone")}
+        
+        Your objectives:
+        1. Search for developments published after {since_label}
+        2. Extract what changed in the changed sources
+        3. Document every new source with URL and publication date
+        
+        Do not repeat findings that are already covered by unchanged sources.""",
+        expected_output="""Delta findings including:
+        - New developments with dates
+        - Facts that changed in previously cited sources
+        - Sources that should be removed
+        - List of new sources with URLs and dates""",
+        agent=researcher
+    )
+    
+    merge_task = Task(
+        description=f"""Merge the delta findings into the existing report below.
+        
+        1. Keep content that is still accurate
+        2. Update or correct facts that changed
+        3. Remove claims that relied only on sources that no longer exist
+        4. Add the new developments and their citations
+        5. Start with a short "What's New Since {since_label}" section
+        
+        EXISTING REPORT:
+        {prior_report}""",
+        expected_output="""The full updated report in the same markdown structure as the
+        existing report, with the "What's New" section first and all citations with URLs and dates""",
+        agent=editor,
+        context=[delta_task]
+    )
+    
+    return [delta_task, merge_task]
+
+@profiled("run_refresh")
+def run_refresh(config, query, prior_report, source_checks, since_label):
+    """Refresh a prior report with only new or changed material.
+    
+    Runs a two-step sequential crew (delta research, then merge by the manager
+    model) instead of a full planning/delegation hierarchy.
+    
+    Args:
+        config: Configuration dict from sidebar
+        query: Original research query
+        prior_report: Markdown of the report being refreshed
+        source_checks: Results of revalidate_sources for the cited URLs
+        since_label: Human-readable date of the prior report
+    
+    Returns:
+        CrewOutput: The merged report
+    """
+    with cassette_from_env(query, config):
+        crew = create_refresh_crew(config, query, prior_report, source_checks, since_label)
+        track_objects(crew, *crew.agents)
+        return crew.kickoff()
+
+def create_refresh_crew(config, query, prior_report, source_checks, since_label):
+    """Build the delta-research and merge crew used by run_refresh.
+    
+    Returns:
+        Crew: Crew ready for kickoff
+    """
+    web_researcher = create_worker_agents(config)[0]
+    editor = Agent(
+        role="Research Director",
+        goal="Keep an existing research report accurate and current with minimal rewriting",
+        backstory="""You are an expert research director who maintains living research reports.
+        You integrate new findings precisely, correct outdated facts and keep citations intact.""",
+        llm=create_llm(
+            config["manager_provider"],
+            config["manager_model"],
+            mode="manager",
+            ollama_options=config.get("ollama_options")
+        ),
+        allow_delegation=False,
+        verbose=True
+    )
+    tasks = create_refresh_tasks(web_researcher, editor, query, prior_report, source_checks, since_label)
+    
+    crew = Crew(
+        agents=[web_researcher, editor],
+        tasks=tasks,
+        verbose=True,
+        process=Process.sequential
+    )
+    
+    return crew
 
 #--------------------------------#
 #      App.py Compatibility      #
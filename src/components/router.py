@@ -0,0 +1,93 @@
+import re
+
+#--------------------------------#
+#         Query Routing          #
+#--------------------------------#
+# Crew topologies, cheapest first
+ROUTES = ("sequential", "reduced", "hierarchical")
+
+LOOKUP_PATTERN = re.compile(
+    r"^\s*(who|what|when|where|which)\s+(is|are|was|were|did)\b|^\s*(define|definition of|how many|how much)\b",
+    re.IGNORECASE
+)
+# Whole-word patterns, so "marketing" isn't a market analysis and "vsync" isn't a comparison
+ANALYSIS_PATTERN = re.compile(
+    r"\b(compar\w*|vs|versus|analy[sz]\w*|trends?|impacts?|implications?|evaluat\w*|assess\w*|"
+    r"forecast\w*|markets?|strateg\w*|pros and cons|landscape|comprehensive|in[- ]depth|deep dive|"
+    r"competitive)\b",
+    re.IGNORECASE
+)
+VERIFICATION_PATTERN = re.compile(
+    r"\b(verif\w*|fact[- ]check\w*|evidence|accura\w*|credib\w*|claims?)\b",
+    re.IGNORECASE
+)
+
+def classify_query(query):
+    """Score a research query's complexity with local heuristics (no LLM call).
+
+    Args:
+        query: User's research query
+
+    Returns:
+        dict: route ("sequential", "reduced" or "hierarchical"), score and the
+            signals that contributed to it
+    """
+    text = query.lower()
+    words = len(text.split())
+    signals = []
+    score = 0
+
+    if words > 40:
+        score += 2
+        signals.append("long query")
+    elif words > 20:
+        score += 1
+        signals.append("medium-length query")
+
+    # Several asks in one query (lists, multiple questions, conjunctions); the
+    # "and" inside "pros and cons" joins one ask, not two
+    conjunctions = len(re.findall(r"\band\b", text.replace("pros and cons", "")))
+    parts = len(re.findall(r"\?|;|\n\s*(?:\d+[.)]|[-*])\s", query)) + conjunctions
+    if parts >= 2:
+        score += min(parts, 3)
+        signals.append(f"{parts} sub-questions")
+
+    # Each distinct analytical term adds a point, so a query stacking several
+    # (compare + market + impact + strategy) reaches the full crew on its own
+    analysis_hits = list(dict.fromkeys(m.lower() for m in ANALYSIS_PATTERN.findall(text)))
+    if analysis_hits:
+        score += min(len(analysis_hits) + 1, 5)
+        signals.append("analysis: " + ", ".join(analysis_hits))
+
+    verification_hits = list(dict.fromkeys(VERIFICATION_PATTERN.findall(text)))
+    if verification_hits:
+        score += 2
+        signals.append("verification: " + ", ".join(verification_hits))
+
+    if LOOKUP_PATTERN.search(query) and words <= 15:
+        score -= 2
+        signals.append("simple lookup")
+
+    if score <= 1:
+        route = "sequential"
+    elif score <= 4:
+        route = "reduced"
+    else:
+        route = "hierarchical"
+
+    return {"route": route, "score": score, "signals": signals}
+
+def resolve_route(config, query):
+    """Pick the crew topology for a run.
+
+    Args:
+        config: Configuration dict from sidebar
+        query: User's research query
+
+    Returns:
+        dict: route, score, signals and whether the route was chosen automatically
+    """
+    mode = config.get("process_mode") or ("hierarchical" if config.get("use_hierarchical") else "sequential")
+    if mode == "auto":
+        return {**classify_query(query), "automatic": True}
+    return {"route": mode, "score": None, "signals": [], "automatic": False}
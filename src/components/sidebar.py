@@ -1,11 +1,35 @@
 import streamlit as st
 import os
+import time
 import requests
 from openai import OpenAI
+from src.utils.ollama import (
+    DEFAULT_KEEP_ALIVE,
+    DEFAULT_NUM_CTX,
+    build_ollama_options,
+    get_ollama_base_url,
+    list_ollama_models,
+    warm_up_ollama_model,
+)
 
-def get_openai_models():
+# Seconds before a failed warm-up is retried
+WARM_UP_RETRY_S = 30
+
+PROCESS_MODES = {
+    "Automatic (by query complexity)": "auto",
+    "Hierarchical": "hierarchical",
+    "Sequential (single agent)": "sequential",
+}
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_openai_models(api_key=""):
     """Fetch available OpenAI models dynamically from the API.
     
+    Cached per API key so reruns don't repeat the network call.
+    
+    Args:
+        api_key: OpenAI API key; without one the default list is returned
+    
     Returns:
         list: List of model IDs, or default list if API call fails
     """
@@ -25,7 +49,6 @@ def get_openai_models():
     ]
     
     try:
-        api_key = os.environ.get("OPENAI_API_KEY", "")
         if not api_key:
             return default_models
         
@@ -63,85 +86,176 @@ def get_openai_models():
     except Exception:
         return default_models
 
+@st.cache_data(ttl=30, show_spinner=False)
+def list_ollama_models_cached(base_url):
+    """Installed Ollama models, cached briefly so reruns don't re-probe the server."""
+    return list_ollama_models(base_url)
+
+@st.cache_resource(show_spinner=False)
+def get_ollama_warmups():
+    """Warm-up results shared by all sessions, since models are loaded per server."""
+    return {}
+
 def render_sidebar():
     """Render the sidebar with API key inputs and model selection.
     
+    Must be called inside a `with st.sidebar:` block; it doesn't open one
+    itself so that it can run as a fragment.
+    
     Returns:
-        dict: Contains 'manager_provider', 'manager_model', 'worker_provider', 'worker_model', 'use_hierarchical'
+        dict: Contains 'manager_provider', 'manager_model', 'worker_provider', 'worker_model',
+            'process_mode', 'use_hierarchical', 'ollama_options'
     """
-    with st.sidebar:
-        st.header("⚙️ Configuration")
+    st.header("⚙️ Configuration")
+    
+    # Process mode: automatic routing, full hierarchy or a single agent
+    process_label = st.selectbox(
+        "Process",
+        list(PROCESS_MODES),
+        help="Automatic sends simple lookups to a single agent and reserves the full manager crew for complex research"
+    )
+    process_mode = PROCESS_MODES[process_label]
+    use_hierarchical = process_mode != "sequential"
+    
+    if use_hierarchical:
+        if process_mode == "auto":
+            st.info("🧭 Automatic mode: each query is routed to a single agent, a reduced crew or the full hierarchy")
+        else:
+            st.info("🎯 Hierarchical mode: Manager agent coordinates specialized researchers")
         
-        # Hierarchical mode toggle
-        use_hierarchical = st.checkbox(
-            "Use Hierarchical Process",
-            value=True,
-            help="Enable manager agent to coordinate multiple worker agents for better research quality"
+        # MANAGER AGENT CONFIGURATION
+        st.subheader("👑 Manager Agent")
+        manager_provider = st.selectbox(
+            "Manager Provider",
+            ["Anthropic (Claude)", "OpenAI", "GROQ", "Zhipu AI (GLM)", "Ollama"],
+            help="Manager coordinates and validates research. Claude Opus 4.5 recommended for best results."
         )
         
-        if use_hierarchical:
-            st.info("🎯 Hierarchical mode: Manager agent coordinates specialized researchers")
-            
-            # MANAGER AGENT CONFIGURATION
-            st.subheader("👑 Manager Agent")
-            manager_provider = st.selectbox(
-                "Manager Provider",
-                ["Anthropic (Claude)", "OpenAI", "GROQ", "Zhipu AI (GLM)", "Ollama"],
-                help="Manager coordinates and validates research. Claude Opus 4.5 recommended for best results."
-            )
-            
-            manager_model, manager_api_key = configure_provider(manager_provider, "manager")
-            
-            # WORKER AGENT CONFIGURATION
-            st.subheader("👥 Worker Agents")
-            worker_provider = st.selectbox(
-                "Worker Provider",
-                ["OpenAI", "Anthropic (Claude)", "GROQ", "Zhipu AI (GLM)", "Ollama"],
-                help="Workers perform specialized research tasks. Can be different from manager."
-            )
-            
-            worker_model, worker_api_key = configure_provider(worker_provider, "worker")
-            
-        else:
-            # SINGLE AGENT MODE (Sequential)
-            st.info("🔗 Sequential mode: Single agent performs all tasks")
-            provider = st.selectbox(
-                "Select LLM Provider",
-                ["OpenAI", "Anthropic (Claude)", "GROQ", "Zhipu AI (GLM)", "Ollama"],
-                help="Choose your preferred language model provider"
-            )
-            
-            manager_model, manager_api_key = configure_provider(provider, "single")
-            manager_provider = provider
-            worker_provider = provider
-            worker_model = manager_model
+        manager_model, manager_api_key = configure_provider(manager_provider, "manager")
+        
+        # WORKER AGENT CONFIGURATION
+        st.subheader("👥 Worker Agents")
+        worker_provider = st.selectbox(
+            "Worker Provider",
+            ["OpenAI", "Anthropic (Claude)", "GROQ", "Zhipu AI (GLM)", "Ollama"],
+            help="Workers perform specialized research tasks. Can be different from manager."
+        )
         
-        # Information section
-        st.divider()
-        st.markdown("### 📚 About")
-        st.markdown("""
-        **Multi-Agent Research Assistant**
+        worker_model, worker_api_key = configure_provider(worker_provider, "worker")
         
-        **Hierarchical Mode (Recommended):**
-        - Manager agent (Claude Opus 4.5) coordinates research
-        - Multiple specialized worker agents
-        - Superior quality through validation
-        - Cost-optimized
+    else:
+        # SINGLE AGENT MODE (Sequential)
+        st.info("🔗 Sequential mode: Single agent performs all tasks")
+        provider = st.selectbox(
+            "Select LLM Provider",
+            ["OpenAI", "Anthropic (Claude)", "GROQ", "Zhipu AI (GLM)", "Ollama"],
+            help="Choose your preferred language model provider"
+        )
         
-        **Features:**
-        - Dynamic model fetching
-        - Built-in web search
-        - Real-time progress
-        - Structured reports
-        """)
+        manager_model, manager_api_key = configure_provider(provider, "single")
+        manager_provider = provider
+        worker_provider = provider
+        worker_model = manager_model
+    
+    # OLLAMA RUNTIME CONFIGURATION
+    ollama_options = None
+    ollama_models = {
+        model for provider, model in [(manager_provider, manager_model), (worker_provider, worker_model)]
+        if provider == "Ollama" and model
+    }
+    if ollama_models:
+        ollama_options = configure_ollama_runtime(sorted(ollama_models))
+    
+    # Information section
+    st.divider()
+    st.markdown("### 📚 About")
+    st.markdown("""
+    **Multi-Agent Research Assistant**
+    
+    **Automatic Mode (Default):**
+    - Simple lookups use a single agent
+    - Broader questions use a researcher + analyst
+    - Complex research gets the full manager crew
+    
+    **Hierarchical Mode:**
+    - Manager agent (Claude Opus 4.5) coordinates research
+    - Multiple specialized worker agents
+    - Superior quality through validation
+    - Cost-optimized
+    
+    **Features:**
+    - Dynamic model fetching
+    - Built-in web search
+    - Real-time progress
+    - Structured reports
+    """)
+    
+    return {
+        "process_mode": process_mode,
+        "use_hierarchical": use_hierarchical,
+        "manager_provider": manager_provider,
+        "manager_model": manager_model,
+        "worker_provider": worker_provider,
+        "worker_model": worker_model,
+        "ollama_options": ollama_options
+    }
+
+def configure_ollama_runtime(models):
+    """Render Ollama runtime settings and warm up the selected models.
+    
+    Args:
+        models: Ollama model names selected for the manager and/or workers
+    
+    Returns:
+        dict: Options passed through to create_llm (keep_alive, num_ctx, num_thread)
+    """
+    st.subheader("🦙 Ollama Runtime")
+    keep_alive = st.text_input(
+        "Keep Alive",
+        value=DEFAULT_KEEP_ALIVE,
+        key="ollama_keep_alive",
+        help="How long Ollama keeps the model loaded between runs (e.g. 30m, 2h, 300 for seconds, -1 to keep it loaded)"
+    )
+    num_ctx = st.number_input(
+        "Context Window (num_ctx)",
+        min_value=2048,
+        max_value=131072,
+        value=DEFAULT_NUM_CTX,
+        step=1024,
+        key="ollama_num_ctx",
+        help="Larger windows fit more scraped content but use more memory"
+    )
+    num_thread = st.number_input(
+        "CPU Threads (num_thread)",
+        min_value=0,
+        max_value=256,
+        value=0,
+        key="ollama_num_thread",
+        help="0 lets Ollama decide. Concurrent request slots are set on the server with OLLAMA_NUM_PARALLEL."
+    )
+    options = build_ollama_options(keep_alive, num_ctx, num_thread)
+    
+    # Warm up once per server/model/options combination so the first agent call
+    # doesn't pay the load; failures are retried after WARM_UP_RETRY_S
+    warmups = get_ollama_warmups()
+    for model in models:
+        warmup_key = (get_ollama_base_url(), model, tuple(sorted(options.items())))
+        warmup = warmups.get(warmup_key)
+        if warmup is None or ("error" in warmup and time.time() - warmup["checked_at"] > WARM_UP_RETRY_S):
+            with st.spinner(f"Warming up {model}..."):
+                warmup = {**warm_up_ollama_model(model, options), "checked_at": time.time()}
+            warmups[warmup_key] = warmup
         
-        return {
-            "use_hierarchical": use_hierarchical,
-            "manager_provider": manager_provider,
-            "manager_model": manager_model,
-            "worker_provider": worker_provider,
-            "worker_model": worker_model
-        }
+        if "error" in warmup:
+            st.warning(f"Warm-up failed for {model}: {warmup['error']}")
+        else:
+            st.caption(
+                f"⏱️ {model} first token: {warmup['cold']['first_token_s']:.2f}s cold "
+                f"→ {warmup['warm']['first_token_s']:.2f}s warm "
+                f"(load {warmup['cold']['load_s']:.2f}s)"
+            )
+    
+    return options
 
 def configure_provider(provider, mode):
     """Configure provider-specific settings.
@@ -195,7 +309,9 @@ def configure_provider(provider, mode):
             os.environ[f"OPENAI_API_KEY_{mode.upper()}"] = api_key
         
         with st.spinner("Loading models..."):
-            available_models = get_openai_models()
+            available_models = get_openai_models(
+                api_key or os.environ.get(f"OPENAI_API_KEY_{mode.upper()}") or os.environ.get("OPENAI_API_KEY", "")
+            )
         
         model = st.selectbox(
             f"Select Model ({mode})",
@@ -258,26 +374,23 @@ def configure_provider(provider, mode):
         return model, api_key
         
     else:  # Ollama
-        st.info("🔧 Make sure Ollama is running locally on port 11434")
+        st.info(f"🔧 Make sure Ollama is running at {get_ollama_base_url()}")
         
         try:
-            response = requests.get("http://localhost:11434/api/tags", timeout=2)
-            if response.status_code == 200:
-                models_data = response.json()
-                available_models = [m["name"] for m in models_data.get("models", [])]
-                if available_models:
-                    model = st.selectbox(
-                        f"Select Local Model ({mode})",
-                        available_models,
-                        key=f"ollama_model_{mode}",
-                        help="Locally installed Ollama models"
-                    )
-                else:
-                    st.warning("No Ollama models found. Run 'ollama pull <model-name>'")
-                    model = None
+            available_models = list_ollama_models_cached(get_ollama_base_url())
+            if available_models:
+                model = st.selectbox(
+                    f"Select Local Model ({mode})",
+                    available_models,
+                    key=f"ollama_model_{mode}",
+                    help="Locally installed Ollama models"
+                )
             else:
-                st.error("Could not connect to Ollama. Make sure it's running.")
+                st.warning("No Ollama models found. Run 'ollama pull <model-name>'")
                 model = None
+        except requests.HTTPError:
+            st.error("Could not connect to Ollama. Make sure it's running.")
+            model = None
         except Exception as e:
             st.error(f"Ollama connection error: {str(e)}")
             model = None
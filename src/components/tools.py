@@ -0,0 +1,35 @@
+import json
+from crewai_tools import SerperDevTool, ScrapeWebsiteTool
+from src.utils.singleflight import SingleFlight
+
+#--------------------------------#
+#        Coalesced Tools         #
+#--------------------------------#
+# Shared across every agent and session in the process
+search_flight = SingleFlight("serper_search")
+scrape_flight = SingleFlight("scrape_website")
+
+# Tool settings that change what a search returns, so they are part of its key
+SERPER_KEY_FIELDS = ("search_url", "base_url", "search_type", "n_results", "country", "location", "locale", "save_file")
+
+class CoalescedSerperDevTool(SerperDevTool):
+    """SerperDevTool that issues one request per identical in-flight query."""
+
+    def _run(self, **kwargs):
+        settings = {field: getattr(self, field, None) for field in SERPER_KEY_FIELDS}
+        key = json.dumps({"settings": settings, "kwargs": kwargs}, sort_keys=True, default=str)
+        return search_flight.do(key, lambda: SerperDevTool._run(self, **kwargs))
+
+class CoalescedScrapeWebsiteTool(ScrapeWebsiteTool):
+    """ScrapeWebsiteTool that fetches each in-flight URL only once."""
+
+    def _run(self, **kwargs):
+        url = (kwargs.get("website_url") or getattr(self, "website_url", None) or "").strip()
+        return scrape_flight.do(url, lambda: ScrapeWebsiteTool._run(self, **kwargs))
+
+def get_coalescing_stats():
+    """Return per-tool call counts, including duplicates that were coalesced.
+
+    Counts are process-wide totals since startup, across all sessions.
+    """
+    return [search_flight.stats(), scrape_flight.stats()]
@@ -0,0 +1,186 @@
+import os
+import io
+import gzip
+import json
+import time
+import uuid
+import hashlib
+import tempfile
+
+#--------------------------------#
+#         Artifact Store         #
+#--------------------------------#
+DEFAULT_ARTIFACT_DIR = "output/runs"
+DEFAULT_RETENTION_DAYS = 14
+DEFAULT_MAX_RUNS = 500
+OBJECT_GRACE_SECONDS = 3600  # Unreferenced objects younger than this may belong to an in-flight save
+
+class ArtifactStore:
+    """Per-run storage for research reports and intermediate task outputs.
+
+    Artifact contents are gzip-compressed and content-addressed under
+    objects/, so identical outputs are stored once and concurrent runs never
+    write to the same file. Each run gets a JSON manifest under runs/ mapping
+    artifact names to content hashes.
+    """
+
+    def __init__(self, root=None, retention_days=None, max_runs=None):
+        self.root = root or os.environ.get("ARTIFACT_DIR", DEFAULT_ARTIFACT_DIR)
+        self.retention_days = float(
+            retention_days if retention_days is not None
+            else os.environ.get("ARTIFACT_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+        )
+        self.max_runs = int(
+            max_runs if max_runs is not None
+            else os.environ.get("ARTIFACT_MAX_RUNS", DEFAULT_MAX_RUNS)
+        )
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.runs_dir = os.path.join(self.root, "runs")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.runs_dir, exist_ok=True)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.gz")
+
+    def _manifest_path(self, run_id):
+        return os.path.join(self.runs_dir, f"{run_id}.json")
+
+    def _atomic_write(self, path, data):
+        """Write bytes to a temp file and rename it into place."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def put(self, content):
+        """Store text content and return its sha256 digest."""
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            # Refresh mtime so a concurrent cleanup doesn't collect it before the manifest lands
+            os.utime(path)
+        else:
+            self._atomic_write(path, gzip.compress(data))
+        return digest
+
+    def save_run(self, query, config, result, extra_artifacts=None, parent_run_id=None):
+        """Persist the final report and intermediate task outputs of a crew run.
+
+        Args:
+            query: User's research query
+            config: Configuration dict from sidebar
+            result: CrewOutput returned by run_research
+            extra_artifacts: Optional {name: text} to store alongside the report
+            parent_run_id: Run this one refreshes, if any
+
+        Returns:
+            str: The new run id
+        """
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        artifacts = {"report.md": str(result)}
+
+        # Hierarchical runs produce one output per worker task
+        for i, task_output in enumerate(getattr(result, "tasks_output", None) or [], start=1):
+            artifacts[f"tasks/{i:02d}.md"] = str(getattr(task_output, "raw", task_output))
+        artifacts.update(extra_artifacts or {})
+
+        manifest = {
+            "run_id": run_id,
+            "created_at": time.time(),
+            "query": query,
+            "parent_run_id": parent_run_id,
+            "config": {k: v for k, v in config.items() if isinstance(v, (str, int, float, bool, type(None)))},
+            "artifacts": {
+                name: {"sha256": self.put(text), "size": len(text.encode("utf-8"))}
+                for name, text in artifacts.items()
+            },
+        }
+        self._atomic_write(self._manifest_path(run_id), json.dumps(manifest, indent=2).encode("utf-8"))
+        return run_id
+
+    def get_manifest(self, run_id):
+        """Return a run's manifest dict, or None if the run doesn't exist."""
+        try:
+            with open(self._manifest_path(run_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def list_runs(self):
+        """Return all run manifests, newest first."""
+        manifests = []
+        for name in os.listdir(self.runs_dir):
+            if name.endswith(".json"):
+                manifest = self.get_manifest(name[:-5])
+                if manifest:
+                    manifests.append(manifest)
+        return sorted(manifests, key=lambda m: m["created_at"], reverse=True)
+
+    def open_artifact(self, run_id, name="report.md"):
+        """Open an artifact for streaming reads.
+
+        Returns:
+            io.BufferedReader: Decompressing reader over the stored bytes
+        """
+        manifest = self.get_manifest(run_id)
+        if not manifest or name not in manifest["artifacts"]:
+            raise FileNotFoundError(f"No artifact '{name}' in run {run_id}")
+        return io.BufferedReader(gzip.open(self._object_path(manifest["artifacts"][name]["sha256"]), "rb"))
+
+    def read_artifact(self, run_id, name="report.md"):
+        """Return an artifact's text content."""
+        with self.open_artifact(run_id, name) as f:
+            return f.read().decode("utf-8")
+
+    def cleanup(self):
+        """Apply retention and delete objects no longer referenced by any run.
+
+        Runs older than retention_days, and the oldest runs beyond max_runs,
+        are removed.
+
+        Returns:
+            list: Ids of the runs that were removed
+        """
+        runs = self.list_runs()
+        cutoff = time.time() - self.retention_days * 86400
+        expired = [m for i, m in enumerate(runs) if i >= self.max_runs or m["created_at"] < cutoff]
+        for manifest in expired:
+            try:
+                os.remove(self._manifest_path(manifest["run_id"]))
+            except FileNotFoundError:
+                pass
+
+        # Sweep even when nothing expired: a save that failed before writing its
+        # manifest leaves objects that no run references
+        referenced = {
+            a["sha256"] for m in self.list_runs() for a in m["artifacts"].values()
+        }
+        grace_cutoff = time.time() - OBJECT_GRACE_SECONDS
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            for name in os.listdir(prefix_dir):
+                path = os.path.join(prefix_dir, name)
+                if name.endswith(".gz") and name[:-3] not in referenced:
+                    try:
+                        if os.path.getmtime(path) < grace_cutoff:
+                            os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+        return [m["run_id"] for m in expired]
+
+_default_store = None
+
+def get_artifact_store():
+    """Return the process-wide artifact store configured from the environment."""
+    global _default_store
+    if _default_store is None:
+        _default_store = ArtifactStore()
+    return _default_store
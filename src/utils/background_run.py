@@ -0,0 +1,62 @@
+import time
+import threading
+from src.utils.memory_profiler import bind_session, current_session_id, track_objects
+from src.utils.output_handler import capture_output
+
+#--------------------------------#
+#         Background Run         #
+#--------------------------------#
+class BackgroundRun:
+    """Runs a long job on a worker thread while capturing its stdout.
+
+    The script thread stays free, so fragments such as a live progress panel
+    can poll output_text and state without blocking the rest of the app.
+    """
+
+    def __init__(self, target, *args, **kwargs):
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs
+        self.state = "pending"  # pending -> running -> complete | error
+        self.result = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._output = None
+        # Captured on the script thread; the worker thread has no Streamlit context
+        self.session_id = current_session_id()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        bind_session(self.session_id, run=self)
+        with capture_output() as output:
+            self._output = output
+            try:
+                self.result = self.target(*self.args, **self.kwargs)
+                self.state = "complete"
+            except Exception as e:
+                self.error = e
+                self.state = "error"
+            finally:
+                self.finished_at = time.time()
+
+    def start(self):
+        self.state = "running"
+        self.started_at = time.time()
+        track_objects(self, session_id=self.session_id, run=self)
+        self._thread.start()
+        return self
+
+    @property
+    def done(self):
+        return self.state in ("complete", "error")
+
+    @property
+    def output_text(self):
+        return self._output.output_text if self._output else ""
+
+    @property
+    def elapsed_s(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
@@ -0,0 +1,306 @@
+import os
+import sys
+import gzip
+import json
+import time
+import uuid
+import hashlib
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+
+#--------------------------------#
+#      Record/Replay Cassettes   #
+#--------------------------------#
+CASSETTE_VERSION = 1
+DEFAULT_CASSETTE_DIR = "output/cassettes"
+
+# Request fields that identify an LLM call; credentials, URLs and timeouts are left out
+LLM_KEY_FIELDS = ("model", "messages", "tools", "stop", "temperature", "max_tokens", "response_format")
+
+# Providers whose calls bypass litellm, so a cassette can't capture or replay them
+UNCAPTURED_PROVIDERS = ("Zhipu AI (GLM)",)
+
+class CassetteMissError(RuntimeError):
+    """Raised in replay mode when a call has no recorded response."""
+
+# litellm.completion and the tool classes are patched process-wide, so only one
+# cassette may be active at a time; overlapping runs wait for it to finish
+_active_lock = threading.Lock()
+_active_owner = None
+
+def _request_key(kind, name, payload):
+    blob = json.dumps([kind, name, payload], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+class Cassette:
+    """Captures LLM and tool calls made during a crew run, or plays them back.
+
+    A cassette is a gzip-compressed JSON-lines file. The first line is a header
+    holding the query and config of the recorded run; every following line is
+    one call with its request key, response and original latency.
+
+    Replay matches calls by request key and, for repeated identical requests,
+    in recorded order. A request whose key was never recorded falls back to the
+    next unused entry of the same kind so that incidental prompt differences
+    (ids, whitespace) don't abort a replay; these are counted as fallbacks.
+    Set strict=True to raise CassetteMissError instead.
+    """
+
+    def __init__(self, path, mode, strict=False):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.strict = strict
+        self.header = {}
+        self.entries = []
+        self.stats = defaultdict(float)
+        self._lock = threading.Lock()
+        self._by_key = defaultdict(deque)
+        self._by_kind = defaultdict(deque)
+        if mode == "replay":
+            self._load()
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            self.header = json.loads(f.readline())
+            for line in f:
+                entry = json.loads(line)
+                self.entries.append(entry)
+                self._by_key[entry["key"]].append(entry)
+                self._by_kind[entry["kind"]].append(entry)
+
+    def save(self):
+        """Write the recorded calls to disk."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"version": CASSETTE_VERSION, **self.header}) + "\n")
+            for entry in self.entries:
+                f.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+
+    def record(self, kind, key, name, response, elapsed_s):
+        with self._lock:
+            self.entries.append({
+                "kind": kind,
+                "key": key,
+                "name": name,
+                "response": response,
+                "elapsed_s": round(elapsed_s, 4),
+            })
+            self.stats[f"{kind}_calls"] += 1
+            self.stats[f"{kind}_elapsed_s"] += elapsed_s
+
+    def replay(self, kind, key, name):
+        with self._lock:
+            if self._by_key[key]:
+                entry = self._by_key[key].popleft()
+                self._by_kind[kind].remove(entry)
+            elif self.strict or not self._by_kind[kind]:
+                raise CassetteMissError(f"No recorded {kind} call for {name} (key {key})")
+            else:
+                entry = self._by_kind[kind].popleft()
+                self._by_key[entry["key"]].remove(entry)
+                self.stats["fallbacks"] += 1
+            self.stats[f"{kind}_calls"] += 1
+            self.stats[f"{kind}_elapsed_s"] += entry["elapsed_s"]
+            return entry["response"]
+
+    def intercept(self, kind, name, payload, call):
+        """Record or replay a single call.
+
+        Args:
+            kind: "llm" or "tool"
+            name: Model or tool name, used in keys and error messages
+            payload: JSON-serializable request that identifies the call
+            call: Zero-argument function performing the real call, returning
+                a JSON-serializable response
+
+        Returns:
+            The recorded or live response
+        """
+        key = _request_key(kind, name, payload)
+        if self.mode == "replay":
+            return self.replay(kind, key, name)
+        start = time.perf_counter()
+        response = call()
+        self.record(kind, key, name, response, time.perf_counter() - start)
+        return response
+
+#--------------------------------#
+#        Library Patching        #
+#--------------------------------#
+def _patch_llm(cassette):
+    """Route litellm.completion, which CrewAI's LLM class calls, through the cassette."""
+    import litellm
+
+    original = litellm.completion
+
+    def completion(*args, **kwargs):
+        # Streaming responses aren't captured: pass them through when recording, refuse in replay
+        if kwargs.get("stream"):
+            if cassette.mode == "record":
+                return original(*args, **kwargs)
+            raise CassetteMissError(
+                f"Streaming call to {kwargs.get('model', '')} can't be replayed; "
+                "streaming calls are not recorded, so disable stream on the LLM"
+            )
+        payload = {k: kwargs.get(k) for k in LLM_KEY_FIELDS}
+        data = cassette.intercept(
+            "llm",
+            kwargs.get("model", ""),
+            payload,
+            lambda: original(*args, **kwargs).model_dump(),
+        )
+        return litellm.ModelResponse(**data)
+
+    litellm.completion = completion
+    return lambda: setattr(litellm, "completion", original)
+
+def _patch_tools(cassette, tool_classes):
+    """Route the _run method of each tool class through the cassette."""
+    restores = []
+    for tool_class in tool_classes:
+        original = tool_class._run
+
+        def _run(self, *args, _original=original, **kwargs):
+            return cassette.intercept(
+                "tool",
+                self.name,
+                {"args": args, "kwargs": kwargs},
+                lambda: str(_original(self, *args, **kwargs)),
+            )
+
+        tool_class._run = _run
+        restores.append(lambda c=tool_class, o=original: setattr(c, "_run", o))
+    return lambda: [restore() for restore in restores]
+
+@contextmanager
+def use_cassette(path, mode, query=None, config=None, strict=False):
+    """Record or replay every LLM and tool call made inside the block.
+
+    Patches are process-wide, so this is meant for profiling, debugging and
+    offline load tests rather than a shared multi-user server. Concurrent runs
+    are serialized: a second cassette waits until the active one is closed.
+    Configs using a provider in UNCAPTURED_PROVIDERS are rejected, since their
+    calls would go to the network unrecorded.
+
+    Args:
+        path: Cassette file path (.jsonl.gz)
+        mode: "record" or "replay"
+        query: Research query, stored in the header when recording
+        config: Configuration dict, stored in the header when recording
+        strict: In replay, fail on any request that wasn't recorded exactly
+
+    Yields:
+        Cassette: The active cassette, whose stats summarize the calls seen
+    """
+    from crewai_tools import SerperDevTool, ScrapeWebsiteTool
+    global _active_owner
+
+    config = config or {}
+    for role in ("manager", "worker"):
+        if config.get(f"{role}_provider") in UNCAPTURED_PROVIDERS:
+            raise ValueError(
+                f"{config[f'{role}_provider']} calls don't go through litellm and can't be "
+                "recorded or replayed; choose another provider for cassette runs"
+            )
+    if _active_owner == threading.get_ident():
+        raise RuntimeError("A cassette is already active on this thread; cassettes can't be nested")
+    _active_lock.acquire()
+    _active_owner = threading.get_ident()
+    try:
+        with _patched(path, mode, query, config, strict, [SerperDevTool, ScrapeWebsiteTool]) as cassette:
+            yield cassette
+    finally:
+        _active_owner = None
+        _active_lock.release()
+
+@contextmanager
+def _patched(path, mode, query, config, strict, tool_classes):
+    cassette = Cassette(path, mode, strict=strict)
+    if mode == "record":
+        cassette.header = {
+            "created_at": time.time(),
+            "query": query,
+            "config": {k: v for k, v in (config or {}).items() if isinstance(v, (str, int, float, bool, dict, type(None)))},
+        }
+
+    saved_env = {}
+    if mode == "replay":
+        # Keep replays fully offline
+        for var in ("CREWAI_DISABLE_TELEMETRY", "OTEL_SDK_DISABLED"):
+            saved_env[var] = os.environ.get(var)
+            os.environ[var] = "true"
+
+    restore_llm = _patch_llm(cassette)
+    restore_tools = _patch_tools(cassette, tool_classes)
+    try:
+        yield cassette
+    finally:
+        restore_tools()
+        restore_llm()
+        for var, value in saved_env.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+        if mode == "record":
+            cassette.save()
+
+def cassette_from_env(query=None, config=None):
+    """Return a cassette context configured by CREW_CASSETTE_MODE/CREW_CASSETTE_PATH.
+
+    With no mode set this is a no-op context, so normal runs are unaffected.
+    """
+    mode = os.environ.get("CREW_CASSETTE_MODE", "").lower()
+    if not mode:
+        return nullcontext()
+    path = os.environ.get("CREW_CASSETTE_PATH")
+    if not path:
+        if mode == "replay":
+            raise ValueError("CREW_CASSETTE_PATH must be set to replay a cassette")
+        path = os.path.join(
+            DEFAULT_CASSETTE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.jsonl.gz"
+        )
+    strict = os.environ.get("CREW_CASSETTE_STRICT", "").lower() in ("1", "true", "yes")
+    return use_cassette(path, mode, query=query, config=config, strict=strict)
+
+#--------------------------------#
+#        Offline Replay CLI      #
+#--------------------------------#
+def main(argv=None):
+    """Replay a recorded run offline and report where the time went.
+
+    Usage: python -m src.utils.cassette <cassette.jsonl.gz> [--strict]
+    """
+    from src.components.researcher import run_research
+
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(main.__doc__)
+        return 2
+    path = argv[0]
+    header = Cassette(path, "replay").header
+    # The CLI manages the cassette itself; an env-configured one would nest
+    os.environ.pop("CREW_CASSETTE_MODE", None)
+
+    start = time.perf_counter()
+    with use_cassette(path, "replay", config=header["config"], strict="--strict" in argv) as cassette:
+        run_research(header["config"], header["query"])
+    wall_s = time.perf_counter() - start
+
+    stats = cassette.stats
+    print(json.dumps({
+        "query": header["query"],
+        "llm_calls": int(stats["llm_calls"]),
+        "tool_calls": int(stats["tool_calls"]),
+        "recorded_llm_s": round(stats["llm_elapsed_s"], 3),
+        "recorded_tool_s": round(stats["tool_elapsed_s"], 3),
+        "replay_wall_s": round(wall_s, 3),
+        "fallbacks": int(stats["fallbacks"]),
+    }, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import os
+import gc
+import json
+import time
+import weakref
+import tracemalloc
+import threading
+import functools
+from collections import deque
+
+#--------------------------------#
+#        Memory Profiling        #
+#--------------------------------#
+# Opt-in: tracemalloc slows allocation-heavy code noticeably
+TOP_N = 10
+MAX_REPORTS = 50
+
+_lock = threading.Lock()
+_local = threading.local()
+_reports = deque(maxlen=MAX_REPORTS)
+_tracked = []  # (weakref, kind, session_id, run_label, tracked_at, owner_run_ref)
+_active_runs = 0  # Profiled calls in flight
+_run_starts = 0  # Profiled calls started since import
+
+def profiling_enabled():
+    """Return True when MEMORY_PROFILING is set to a truthy value."""
+    return os.environ.get("MEMORY_PROFILING", "").lower() in ("1", "true", "yes")
+
+def current_session_id():
+    """Return the Streamlit session id of the calling script thread, if any."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+def _session_active(session_id):
+    try:
+        from streamlit import runtime
+        if not runtime.exists():
+            return False
+        return runtime.get_instance().is_active_session(session_id)
+    except Exception:
+        return False
+
+def bind_session(session_id, run=None):
+    """Attribute profiles and tracked objects on this thread to a session.
+
+    Pass the background run doing the work so objects it creates aren't
+    reported as retained while it is still running.
+    """
+    _local.session_id = session_id
+    _local.run_ref = weakref.ref(run) if run is not None else None
+
+def _run_active(run_ref):
+    run = run_ref() if run_ref is not None else None
+    return run is not None and not run.done
+
+def track_objects(*objects, kind=None, session_id=None, run=None):
+    """Remember weak references to objects that should die with their session.
+
+    No-op unless profiling is enabled. Objects that don't support weak
+    references are skipped. The session and owning run default to the ones
+    bound to the calling thread. Dead references are pruned as a side effect.
+    """
+    if not profiling_enabled():
+        return
+    session_id = session_id or getattr(_local, "session_id", None) or current_session_id()
+    run_label = getattr(_local, "run_label", None)
+    run_ref = weakref.ref(run) if run is not None else getattr(_local, "run_ref", None)
+    with _lock:
+        _tracked[:] = [entry for entry in _tracked if entry[0]() is not None]
+        for obj in objects:
+            if obj is None:
+                continue
+            try:
+                ref = weakref.ref(obj)
+            except TypeError:
+                continue
+            _tracked.append((ref, kind or type(obj).__name__, session_id, run_label, time.time(), run_ref))
+
+def _format_stat(stat):
+    frame = stat.traceback[0]
+    return {
+        "site": f"{frame.filename}:{frame.lineno}",
+        "size_diff_kb": round(stat.size_diff / 1024, 1),
+        "count_diff": stat.count_diff,
+    }
+
+def _take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ))
+
+def profiled(label):
+    """Decorator that snapshots memory before and after each call when profiling is enabled.
+
+    Records peak traced memory, the net change and the top allocation sites
+    for the call. tracemalloc is process-wide: while another profiled call is
+    in flight the peak isn't reset and allocations from both are counted, so
+    such reports are marked "overlapped" and their numbers are upper bounds.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            global _active_runs, _run_starts
+            if not profiling_enabled():
+                return func(*args, **kwargs)
+
+            with _lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start(int(os.environ.get("MEMORY_PROFILING_FRAMES", 1)))
+                overlapped = _active_runs > 0
+                if not overlapped:
+                    # Resetting now would clobber the peak of a run already in flight
+                    tracemalloc.reset_peak()
+                _active_runs += 1
+                _run_starts += 1
+                starts_at_begin = _run_starts
+            _local.run_label = f"{label}@{time.strftime('%H:%M:%S')}"
+            before = _take_snapshot()
+            current_before, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current_after, peak = tracemalloc.get_traced_memory()
+                after = _take_snapshot()
+                with _lock:
+                    _active_runs -= 1
+                    overlapped = overlapped or _run_starts != starts_at_begin
+                report = {
+                    "run": _local.run_label,
+                    "session_id": getattr(_local, "session_id", None),
+                    "elapsed_s": round(time.perf_counter() - start, 2),
+                    "peak_mb": round(peak / 2**20, 2),
+                    "net_mb": round((current_after - current_before) / 2**20, 2),
+                    "overlapped": overlapped,
+                    "top_allocations": [_format_stat(s) for s in after.compare_to(before, "lineno")[:TOP_N]],
+                }
+                with _lock:
+                    _reports.append(report)
+                _local.run_label = None
+                dump_path = os.environ.get("MEMORY_PROFILE_DUMP")
+                if dump_path:
+                    dump_report(dump_path)
+        return wrapper
+    return decorator
+
+def find_retained():
+    """Return tracked objects still alive after their session ended.
+
+    Objects without a session (created outside Streamlit, e.g. by the replay
+    CLI) and objects whose background run is still going are not reported.
+    Dead references are pruned as a side effect.
+    """
+    gc.collect()
+    retained = []
+    with _lock:
+        _tracked[:] = [entry for entry in _tracked if entry[0]() is not None]
+        entries = list(_tracked)
+    active = {}
+    for ref, kind, session_id, run_label, tracked_at, run_ref in entries:
+        if session_id is None or _run_active(run_ref):
+            continue
+        if session_id not in active:
+            active[session_id] = _session_active(session_id)
+        if active[session_id]:
+            continue
+        obj = ref()
+        if obj is None:
+            continue
+        retained.append({
+            "kind": kind,
+            "session_id": session_id,
+            "run": run_label,
+            "age_s": round(time.time() - tracked_at),
+            # Who is holding on to it
+            "referrers": sorted({type(r).__name__ for r in gc.get_referrers(obj)} - {"frame"})[:5],
+        })
+        del obj
+    return retained
+
+def get_memory_report():
+    """Return profiling status, per-run reports and retained objects."""
+    current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+    with _lock:
+        runs = list(_reports)
+        tracked = len(_tracked)
+        unattributed = sum(1 for entry in _tracked if entry[2] is None)
+    return {
+        "enabled": profiling_enabled(),
+        "tracing": tracemalloc.is_tracing(),
+        "traced_current_mb": round(current / 2**20, 2),
+        "traced_peak_mb": round(peak / 2**20, 2),
+        "tracked_objects": tracked,
+        "unattributed_objects": unattributed,
+        "runs": runs,
+        "retained": find_retained() if profiling_enabled() else [],
+    }
+
+def dump_report(path):
+    """Write get_memory_report() to a JSON file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(get_memory_report(), f, indent=2)
@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import requests
+
+#--------------------------------#
+#        Ollama Settings         #
+#--------------------------------#
+DEFAULT_OLLAMA_BASE_URL = "http://localhost:11434"
+DEFAULT_KEEP_ALIVE = "30m"
+DEFAULT_NUM_CTX = 8192
+# Warm-up runs while the sidebar renders, so a slow cold load gives up early
+WARM_UP_TIMEOUT = 20
+
+def get_ollama_base_url():
+    """Return the Ollama server URL.
+
+    Reads OLLAMA_BASE_URL so the app can be pointed at a remote server or at a
+    local Ollama-compatible stub during testing.
+    """
+    return os.environ.get("OLLAMA_BASE_URL", DEFAULT_OLLAMA_BASE_URL).rstrip("/")
+
+def build_ollama_options(keep_alive=DEFAULT_KEEP_ALIVE, num_ctx=DEFAULT_NUM_CTX, num_thread=0):
+    """Build the runtime options passed through to Ollama.
+
+    Args:
+        keep_alive: How long Ollama keeps the model loaded after a request ("30m", "2h",
+            or a number of seconds such as "300"; "-1" keeps it loaded indefinitely)
+        num_ctx: Context window size in tokens
+        num_thread: CPU threads used for generation (0 lets Ollama decide)
+
+    Returns:
+        dict: Options accepted by create_llm and the warm-up helpers
+    """
+    keep_alive = str(keep_alive or DEFAULT_KEEP_ALIVE).strip()
+    # Ollama parses string durations with Go's time.ParseDuration, which rejects
+    # unitless numbers; plain seconds (including -1) must be sent as integers
+    try:
+        keep_alive = int(keep_alive)
+    except ValueError:
+        pass
+    options = {"keep_alive": keep_alive}
+    if num_ctx:
+        options["num_ctx"] = int(num_ctx)
+    if num_thread:
+        options["num_thread"] = int(num_thread)
+    return options
+
+def _model_options(options):
+    """Split Ollama's per-request model options from keep_alive."""
+    return {k: v for k, v in (options or {}).items() if k != "keep_alive"}
+
+#--------------------------------#
+#      Warm-up & Latency         #
+#--------------------------------#
+def list_ollama_models(base_url=None, timeout=2):
+    """Return the names of the models installed on the Ollama server."""
+    response = requests.get(f"{base_url or get_ollama_base_url()}/api/tags", timeout=timeout)
+    response.raise_for_status()
+    return [m["name"] for m in response.json().get("models", [])]
+
+def measure_first_token_latency(model, options=None, base_url=None, timeout=300):
+    """Time a one-token streamed generation against the Ollama server.
+
+    Args:
+        model: Ollama model name
+        options: Options from build_ollama_options
+        base_url: Server URL, defaults to get_ollama_base_url()
+        timeout: Request timeout in seconds (a cold load can be slow)
+
+    Returns:
+        dict: first_token_s (wall clock) and load_s (Ollama's reported load_duration)
+    """
+    options = options or {}
+    payload = {
+        "model": model,
+        "prompt": "Hi",
+        "stream": True,
+        "keep_alive": options.get("keep_alive", DEFAULT_KEEP_ALIVE),
+        "options": {**_model_options(options), "num_predict": 1},
+    }
+    start = time.perf_counter()
+    first_token_s = None
+    load_s = 0.0
+    with requests.post(
+        f"{base_url or get_ollama_base_url()}/api/generate",
+        json=payload,
+        stream=True,
+        timeout=timeout,
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if first_token_s is None:
+                first_token_s = time.perf_counter() - start
+            if chunk.get("done"):
+                load_s = chunk.get("load_duration", 0) / 1e9
+                break
+    if first_token_s is None:
+        first_token_s = time.perf_counter() - start
+    return {"first_token_s": first_token_s, "load_s": load_s}
+
+def warm_up_ollama_model(model, options=None, base_url=None, timeout=WARM_UP_TIMEOUT):
+    """Load a model into memory and record first-token latency before and after.
+
+    The first probe pays the model load (cold) and keeps the model resident for
+    keep_alive; the second probe shows the latency agents will actually see.
+    A load slower than timeout is reported as an error; Ollama keeps loading
+    the model, so a later retry usually succeeds.
+
+    Returns:
+        dict: model, cold and warm latency measurements, or error on failure
+    """
+    try:
+        cold = measure_first_token_latency(model, options, base_url, timeout)
+        warm = measure_first_token_latency(model, options, base_url, timeout)
+    except (requests.RequestException, ValueError) as e:
+        # ValueError covers non-JSON lines from a server that isn't really Ollama
+        return {"model": model, "error": str(e)}
+    return {"model": model, "cold": cold, "warm": warm}
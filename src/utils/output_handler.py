@@ -1,14 +1,21 @@
 import streamlit as st
 import sys
+import threading
 from contextlib import contextmanager
-from io import StringIO
 import re
+from src.utils.memory_profiler import track_objects
 
 #--------------------------------#
 #         Output Handler         #
 #--------------------------------#
 class StreamlitProcessOutput:
-    def __init__(self, container):
+    """Collects cleaned, de-duplicated process output.
+
+    With a container the text is rendered as it arrives. Without one (runs on
+    a background thread, which can't touch Streamlit elements) it is only
+    accumulated in output_text for a progress panel to poll.
+    """
+    def __init__(self, container=None):
         self.container = container
         self.output_text = ""
         self.seen_lines = set()
@@ -47,22 +54,58 @@ class StreamlitProcessOutput:
             self.output_text = f"{self.output_text}\n{new_content}" if self.output_text else new_content
             
             # Update the display
-            self.container.text(self.output_text)
+            if self.container is not None:
+                self.container.text(self.output_text)
         
     def flush(self):
         pass
 
+class ThreadRoutedStdout:
+    """sys.stdout replacement that sends each thread's writes to its own handler.
+
+    Threads without a registered handler write to the original stdout, so
+    concurrent sessions never see each other's output.
+    """
+    def __init__(self, default):
+        self.default = default
+        self.handlers = {}
+        
+    def write(self, text):
+        self.handlers.get(threading.get_ident(), self.default).write(text)
+        
+    def flush(self):
+        self.handlers.get(threading.get_ident(), self.default).flush()
+        
+    def __getattr__(self, name):
+        return getattr(self.default, name)
+
+_install_lock = threading.Lock()
+
+def _get_router():
+    with _install_lock:
+        if not isinstance(sys.stdout, ThreadRoutedStdout):
+            sys.stdout = ThreadRoutedStdout(sys.stdout)
+        return sys.stdout
+
 @contextmanager
-def capture_output(container):
-    """Capture stdout and redirect it to a Streamlit container."""
-    string_io = StringIO()
+def capture_output(container=None):
+    """Capture the current thread's stdout into a StreamlitProcessOutput.
+    
+    Args:
+        container: Streamlit container to render into, or None to only collect
+    
+    Yields:
+        StreamlitProcessOutput: Handler whose output_text holds the captured log
+    """
     output_handler = StreamlitProcessOutput(container)
-    old_stdout = sys.stdout
-    sys.stdout = output_handler
+    track_objects(output_handler)
+    router = _get_router()
+    thread_id = threading.get_ident()
+    router.handlers[thread_id] = output_handler
     try:
-        yield string_io
+        yield output_handler
     finally:
-        sys.stdout = old_stdout
+        router.handlers.pop(thread_id, None)
 
 # Export the capture_output function
 __all__ = ['capture_output']
\ No newline at end of file
@@ -0,0 +1,246 @@
+import os
+import re
+import time
+import sqlite3
+from contextlib import closing
+
+#--------------------------------#
+#         Report History         #
+#--------------------------------#
+DEFAULT_HISTORY_DB = "output/history.db"
+URL_PATTERN = re.compile(r"https?://[^\s<>()\[\]\"'`]+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL,
+    query TEXT NOT NULL,
+    provider TEXT,
+    model TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_created_at ON runs(created_at DESC);
+-- FTS rows share their rowid with runs.id, so per-run lookups use the rowid
+-- instead of scanning every stored report
+CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+    query,
+    report,
+    urls,
+    tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    route TEXT NOT NULL,
+    automatic INTEGER NOT NULL,
+    score INTEGER,
+    elapsed_s REAL,
+    total_tokens INTEGER,
+    baseline_elapsed_s REAL,
+    baseline_tokens REAL
+);
+CREATE INDEX IF NOT EXISTS run_metrics_route ON run_metrics(route, created_at DESC);
+"""
+
+BASELINE_WINDOW = 50
+
+def extract_urls(text):
+    """Return the unique URLs cited in a report, in order of appearance."""
+    return list(dict.fromkeys(url.rstrip(".,;:") for url in URL_PATTERN.findall(text)))
+
+def _to_match_expression(search):
+    """Turn free text into an FTS5 prefix query that can't raise syntax errors."""
+    terms = re.findall(r"\w+", search)
+    return " ".join(f'"{term}"*' for term in terms)
+
+class ReportHistory:
+    """SQLite FTS5 index over past queries, final reports and cited URLs.
+
+    Only run metadata and the index live here; report bodies are read lazily
+    from the artifact store when a result is opened.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("HISTORY_DB_PATH", DEFAULT_HISTORY_DB)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._migrate(conn)
+
+    def _migrate(self, conn):
+        """Create the schema, moving databases keyed by an FTS run_id column onto runs.id."""
+        columns = [row["name"] for row in conn.execute("PRAGMA table_info(runs)")]
+        legacy = bool(columns) and "id" not in columns
+        with conn:
+            if legacy:
+                conn.execute("DROP INDEX IF EXISTS runs_created_at")
+                conn.execute("ALTER TABLE runs RENAME TO runs_legacy")
+                conn.execute("ALTER TABLE reports_fts RENAME TO reports_fts_legacy")
+        conn.executescript(SCHEMA)
+        if legacy:
+            with conn:
+                conn.execute(
+                    "INSERT INTO runs (run_id, created_at, query, provider, model) "
+                    "SELECT run_id, created_at, query, provider, model FROM runs_legacy"
+                )
+                conn.execute(
+                    "INSERT INTO reports_fts (rowid, query, report, urls) "
+                    "SELECT r.id, f.query, f.report, f.urls FROM reports_fts_legacy f JOIN runs r ON r.run_id = f.run_id"
+                )
+                conn.execute("DROP TABLE reports_fts_legacy")
+                conn.execute("DROP TABLE runs_legacy")
+
+    def _connect(self):
+        # One short-lived connection per call keeps concurrent sessions thread-safe
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add_run(self, run_id, query, report, config=None, created_at=None):
+        """Index a completed run."""
+        config = config or {}
+        with closing(self._connect()) as conn, conn:
+            self._delete(conn, [run_id])
+            row_id = conn.execute(
+                "INSERT INTO runs (run_id, created_at, query, provider, model) VALUES (?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    created_at or time.time(),
+                    query,
+                    config.get("manager_provider"),
+                    config.get("manager_model"),
+                ),
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO reports_fts (rowid, query, report, urls) VALUES (?, ?, ?, ?)",
+                (row_id, query, report, " ".join(extract_urls(report))),
+            )
+
+    @staticmethod
+    def _delete(conn, run_ids):
+        params = [(r,) for r in run_ids]
+        # FTS rows first, while their runs.id can still be looked up
+        conn.executemany("DELETE FROM reports_fts WHERE rowid = (SELECT id FROM runs WHERE run_id = ?)", params)
+        conn.executemany("DELETE FROM runs WHERE run_id = ?", params)
+
+    def remove_runs(self, run_ids):
+        """Drop runs from the index, e.g. after artifact retention cleanup."""
+        if not run_ids:
+            return
+        with closing(self._connect()) as conn, conn:
+            self._delete(conn, run_ids)
+            conn.executemany("DELETE FROM run_metrics WHERE run_id = ?", [(r,) for r in run_ids])
+
+    def search(self, search="", page=0, page_size=10):
+        """Return one page of matching runs.
+
+        Args:
+            search: Free-text search; empty returns the most recent runs
+            page: Zero-based page number
+            page_size: Results per page
+
+        Returns:
+            tuple: (list of row dicts, has_more). Rows carry run_id, created_at,
+                query and a highlighted snippet, not the full report.
+        """
+        match = _to_match_expression(search)
+        # Fetch one extra row to know whether another page exists without a COUNT(*)
+        params = [page_size + 1, page * page_size]
+        if match:
+            sql = """
+                SELECT r.run_id, r.created_at, r.query, r.provider, r.model,
+                       snippet(reports_fts, 1, '**', '**', ' … ', 24) AS snippet
+                FROM reports_fts
+                JOIN runs r ON r.id = reports_fts.rowid
+                WHERE reports_fts MATCH ?
+                ORDER BY bm25(reports_fts, 5.0, 1.0, 2.0)
+                LIMIT ? OFFSET ?
+            """
+            params.insert(0, match)
+        else:
+            sql = """
+                SELECT run_id, created_at, query, provider, model, '' AS snippet
+                FROM runs
+                ORDER BY created_at DESC
+                LIMIT ? OFFSET ?
+            """
+        with closing(self._connect()) as conn:
+            rows = [dict(row) for row in conn.execute(sql, params)]
+        return rows[:page_size], len(rows) > page_size
+
+    def get_route_baseline(self, route="hierarchical"):
+        """Average latency and tokens of recent runs on a route, or None without data."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                """
+                SELECT AVG(elapsed_s) AS elapsed_s, AVG(total_tokens) AS total_tokens, COUNT(*) AS runs
+                FROM (SELECT elapsed_s, total_tokens FROM run_metrics
+                      WHERE route = ? ORDER BY created_at DESC LIMIT ?)
+                """,
+                (route, BASELINE_WINDOW),
+            ).fetchone()
+        return dict(row) if row["runs"] else None
+
+    def add_run_metrics(self, run_id, decision, elapsed_s, total_tokens):
+        """Record a run's routing decision and what it saved against the full crew.
+
+        The baseline is the recent average of hierarchical runs, so savings are
+        only recorded once at least one hierarchical run has been measured.
+
+        Args:
+            run_id: Run id from the artifact store
+            decision: Result of router.resolve_route
+            elapsed_s: Wall-clock duration of the crew run
+            total_tokens: Tokens used by the crew run
+        """
+        baseline = None
+        if decision["route"] != "hierarchical":
+            baseline = self.get_route_baseline("hierarchical")
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO run_metrics
+                (run_id, created_at, route, automatic, score, elapsed_s, total_tokens, baseline_elapsed_s, baseline_tokens)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    run_id,
+                    time.time(),
+                    decision["route"],
+                    int(decision["automatic"]),
+                    decision["score"],
+                    elapsed_s,
+                    total_tokens,
+                    baseline["elapsed_s"] if baseline else None,
+                    baseline["total_tokens"] if baseline else None,
+                ),
+            )
+
+    def get_run_metrics(self, run_id):
+        """Return a run's routing metrics, or None if none were recorded."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM run_metrics WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def get_routing_savings(self):
+        """Total latency and tokens saved by automatic routing decisions."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                """
+                SELECT COUNT(*) AS decisions,
+                       SUM(baseline_elapsed_s - elapsed_s) AS elapsed_s_saved,
+                       SUM(baseline_tokens - total_tokens) AS tokens_saved
+                FROM run_metrics
+                WHERE automatic = 1 AND baseline_elapsed_s IS NOT NULL
+                """
+            ).fetchone()
+        return dict(row)
+
+_default_history = None
+
+def get_report_history():
+    """Return the process-wide report history configured from the environment."""
+    global _default_history
+    if _default_history is None:
+        _default_history = ReportHistory()
+    return _default_history
@@ -0,0 +1,66 @@
+import threading
+
+#--------------------------------#
+#      Singleflight Coalescing   #
+#--------------------------------#
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait and receive the same result (or exception). Nothing is
+    cached once the call completes.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def do(self, key, fn):
+        """Run fn() for key, or wait for the identical call already in flight.
+
+        Args:
+            key: Hashable identity of the request
+            fn: Zero-argument function performing the request
+
+        Returns:
+            The result of the single execution for this key
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        """Return call, execution and coalesced (duplicate) counts."""
+        with self._lock:
+            return {"name": self.name, **self._stats, "in_flight": len(self._calls)}
@@ -0,0 +1,88 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+import requests
+
+#--------------------------------#
+#       Source Revalidation      #
+#--------------------------------#
+MAX_BODY_BYTES = 2 * 1024 * 1024
+USER_AGENT = "Mozilla/5.0 (compatible; CrewAI-Research-Assistant)"
+
+def check_source(url, since, validator=None, timeout=10):
+    """Revalidate one cited URL with a conditional GET.
+
+    Sends If-None-Match/If-Modified-Since from the previous check when
+    available, otherwise If-Modified-Since with the time of the prior report.
+
+    Args:
+        url: Source URL
+        since: Unix timestamp of the prior report
+        validator: Result of a previous check_source for this URL, if any
+        timeout: Request timeout in seconds
+
+    Returns:
+        dict: url, status ("unchanged", "changed", "unknown", "gone" or "error"),
+            and etag/last_modified/content_hash for the next refresh
+    """
+    validator = validator or {}
+    headers = {"User-Agent": USER_AGENT}
+    if validator.get("etag"):
+        headers["If-None-Match"] = validator["etag"]
+    headers["If-Modified-Since"] = validator.get("last_modified") or formatdate(since, usegmt=True)
+
+    try:
+        with requests.get(url, headers=headers, timeout=timeout, stream=True, allow_redirects=True) as response:
+            if response.status_code == 304:
+                # Keep the validators but not an error left over from an earlier check
+                kept = {k: v for k, v in validator.items() if k != "error"}
+                return {**kept, "url": url, "status": "unchanged"}
+            if response.status_code in (404, 410):
+                return {"url": url, "status": "gone"}
+            if response.status_code >= 400:
+                return {**validator, "url": url, "status": "error", "error": f"HTTP {response.status_code}"}
+
+            digest = hashlib.sha256()
+            read = 0
+            for chunk in response.iter_content(chunk_size=65536):
+                digest.update(chunk)
+                read += len(chunk)
+                if read >= MAX_BODY_BYTES:
+                    break
+            result = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "content_hash": digest.hexdigest(),
+            }
+    except requests.RequestException as e:
+        return {**validator, "url": url, "status": "error", "error": str(e)}
+
+    # Servers that ignore conditional headers still reveal changes through
+    # a previous content hash or their Last-Modified date
+    if validator.get("content_hash"):
+        result["status"] = "unchanged" if validator["content_hash"] == result["content_hash"] else "changed"
+    elif result["last_modified"]:
+        try:
+            modified = parsedate_to_datetime(result["last_modified"]).timestamp()
+            result["status"] = "unchanged" if modified <= since else "changed"
+        except (TypeError, ValueError):
+            result["status"] = "unknown"
+    else:
+        result["status"] = "unknown"
+    return result
+
+def revalidate_sources(urls, since, validators=None, max_workers=8):
+    """Revalidate cited URLs concurrently.
+
+    Args:
+        urls: URLs cited by the prior report
+        since: Unix timestamp of the prior report
+        validators: {url: previous check_source result} from an earlier refresh
+
+    Returns:
+        list: check_source results in the order of urls
+    """
+    validators = validators or {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda url: check_source(url, since, validators.get(url)), urls))
@@ -0,0 +1,107 @@
+import sys
+import types
+
+import pytest
+
+from src.utils.cassette import Cassette, CassetteMissError, use_cassette
+
+def _call(response):
+    calls = []
+
+    def call():
+        calls.append(response)
+        return response
+    return call, calls
+
+@pytest.fixture
+def recorded(tmp_path):
+    """Cassette with two identical searches and one scrape."""
+    path = str(tmp_path / "run.jsonl.gz")
+    cassette = Cassette(path, "record")
+    cassette.header = {"query": "q", "config": {"route": "reduced"}}
+    cassette.intercept("tool", "Search", {"q": "agents"}, lambda: "first")
+    cassette.intercept("tool", "Search", {"q": "agents"}, lambda: "second")
+    cassette.intercept("tool", "Scrape", {"url": "https://x"}, lambda: "page")
+    cassette.save()
+    return path
+
+#--------------------------------#
+#        Matching & Storage      #
+#--------------------------------#
+def test_save_and_load_round_trip(recorded):
+    cassette = Cassette(recorded, "replay")
+    assert cassette.header["query"] == "q"
+    assert cassette.header["config"] == {"route": "reduced"}
+    assert [e["response"] for e in cassette.entries] == ["first", "second", "page"]
+
+def test_replay_matches_by_key_then_recorded_order(recorded):
+    cassette = Cassette(recorded, "replay")
+    live, calls = _call("live")
+    assert cassette.intercept("tool", "Scrape", {"url": "https://x"}, live) == "page"
+    assert cassette.intercept("tool", "Search", {"q": "agents"}, live) == "first"
+    assert cassette.intercept("tool", "Search", {"q": "agents"}, live) == "second"
+    assert calls == []
+    assert cassette.stats["fallbacks"] == 0
+    assert cassette.stats["tool_calls"] == 3
+
+def test_unknown_request_falls_back_to_next_entry_of_kind(recorded):
+    cassette = Cassette(recorded, "replay")
+    assert cassette.intercept("tool", "Search", {"q": "other"}, _call("live")[0]) == "first"
+    assert cassette.stats["fallbacks"] == 1
+    # The fallback consumed "first"; the exact match gets the remaining entry
+    assert cassette.intercept("tool", "Search", {"q": "agents"}, _call("live")[0]) == "second"
+    assert cassette.intercept("tool", "Scrape", {"url": "https://x"}, _call("live")[0]) == "page"
+    with pytest.raises(CassetteMissError):
+        cassette.intercept("tool", "Search", {"q": "agents"}, _call("live")[0])
+
+def test_strict_replay_raises_on_unknown_request(recorded):
+    cassette = Cassette(recorded, "replay", strict=True)
+    with pytest.raises(CassetteMissError):
+        cassette.intercept("tool", "Search", {"q": "other"}, _call("live")[0])
+
+def test_kinds_do_not_fall_back_into_each_other(recorded):
+    cassette = Cassette(recorded, "replay")
+    with pytest.raises(CassetteMissError):
+        cassette.intercept("llm", "gpt-4o", {"messages": []}, _call("live")[0])
+
+#--------------------------------#
+#        Patching & Guards       #
+#--------------------------------#
+@pytest.fixture
+def fake_libraries(monkeypatch):
+    """Minimal litellm and crewai_tools modules, so patching runs without the real packages."""
+    litellm = types.ModuleType("litellm")
+    litellm.completion = lambda *args, **kwargs: None
+    litellm.ModelResponse = dict
+    tools = types.ModuleType("crewai_tools")
+    tools.SerperDevTool = type("SerperDevTool", (), {"name": "Search", "_run": lambda self, **kw: "live"})
+    tools.ScrapeWebsiteTool = type("ScrapeWebsiteTool", (), {"name": "Scrape", "_run": lambda self, **kw: "live"})
+    monkeypatch.setitem(sys.modules, "litellm", litellm)
+    monkeypatch.setitem(sys.modules, "crewai_tools", tools)
+    return litellm, tools
+
+def test_replay_refuses_streaming_calls(recorded, fake_libraries):
+    litellm, _ = fake_libraries
+    with use_cassette(recorded, "replay"):
+        with pytest.raises(CassetteMissError):
+            litellm.completion(model="gpt-4o", messages=[], stream=True)
+
+def test_replay_patches_tools_and_restores_them(recorded, fake_libraries):
+    litellm, tools = fake_libraries
+    original = litellm.completion
+    with use_cassette(recorded, "replay") as cassette:
+        assert tools.ScrapeWebsiteTool()._run(url="https://x") != "live"
+    assert cassette.stats["tool_calls"] == 1
+    assert litellm.completion is original
+    assert tools.ScrapeWebsiteTool()._run(url="https://x") == "live"
+
+def test_nested_cassettes_are_rejected(recorded, fake_libraries):
+    with use_cassette(recorded, "replay"):
+        with pytest.raises(RuntimeError):
+            with use_cassette(recorded, "replay"):
+                pass
+
+def test_uncaptured_provider_is_rejected(recorded, fake_libraries):
+    with pytest.raises(ValueError):
+        with use_cassette(recorded, "replay", config={"worker_provider": "Zhipu AI (GLM)"}):
+            pass
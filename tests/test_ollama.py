@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.utils.ollama import build_ollama_options, list_ollama_models, warm_up_ollama_model
+
+#--------------------------------#
+#     Ollama-compatible Stub     #
+#--------------------------------#
+class OllamaStub(BaseHTTPRequestHandler):
+    load_seconds = 0.2
+    loaded = False
+    requests = []
+    broken = False
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = json.dumps({"models": [{"name": "llama3"}]}).encode()
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests.append(payload)
+        self.send_response(200)
+        self.end_headers()
+        if type(self).broken:
+            self.wfile.write(b"<html>not ollama</html>\n")
+            return
+        load = 0 if type(self).loaded else type(self).load_seconds
+        time.sleep(load)
+        type(self).loaded = True
+        self.wfile.write(json.dumps({"response": "H", "done": False}).encode() + b"\n")
+        self.wfile.write(json.dumps({"done": True, "load_duration": int(load * 1e9)}).encode() + b"\n")
+
+@pytest.fixture
+def stub_url():
+    OllamaStub.loaded = False
+    OllamaStub.broken = False
+    OllamaStub.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OllamaStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+def test_build_options_sends_numeric_keep_alive_as_int():
+    assert build_ollama_options("-1", 4096, 0) == {"keep_alive": -1, "num_ctx": 4096}
+    assert build_ollama_options("300")["keep_alive"] == 300
+    assert build_ollama_options("30m", 4096, 8) == {"keep_alive": "30m", "num_ctx": 4096, "num_thread": 8}
+
+def test_list_models(stub_url):
+    assert list_ollama_models(stub_url) == ["llama3"]
+
+def test_warm_up_records_cold_and_warm_latency(stub_url):
+    result = warm_up_ollama_model("llama3", build_ollama_options("-1", 4096), base_url=stub_url)
+
+    assert result["cold"]["first_token_s"] >= OllamaStub.load_seconds
+    assert result["cold"]["load_s"] == pytest.approx(OllamaStub.load_seconds)
+    assert result["warm"]["first_token_s"] < result["cold"]["first_token_s"]
+    assert result["warm"]["load_s"] == 0
+    assert OllamaStub.requests[0]["keep_alive"] == -1
+    assert OllamaStub.requests[0]["options"] == {"num_ctx": 4096, "num_predict": 1}
+
+def test_warm_up_reports_non_ollama_server_as_error(stub_url):
+    OllamaStub.broken = True
+    result = warm_up_ollama_model("llama3", base_url=stub_url)
+    assert "error" in result
+
+def test_warm_up_gives_up_on_slow_cold_load(stub_url):
+    result = warm_up_ollama_model("llama3", base_url=stub_url, timeout=OllamaStub.load_seconds / 4)
+    assert "error" in result
@@ -0,0 +1,40 @@
+import pytest
+
+from src.components.router import classify_query, resolve_route
+
+@pytest.mark.parametrize("query", [
+    "What is CrewAI?",
+    "define marketing",
+    "Who won the 2025 Nobel Prize in Physics?",
+    "Research the latest AI Agent news in February 2025 and summarize each.",
+])
+def test_simple_queries_route_to_single_agent(query):
+    assert classify_query(query)["route"] == "sequential"
+
+@pytest.mark.parametrize("query", [
+    "Assess the impact of the EU AI Act on startups",
+    "Pros and cons of running LLMs locally",
+    "Latest trends in open-weight language models",
+])
+def test_moderate_queries_route_to_reduced_crew(query):
+    assert classify_query(query)["route"] == "reduced"
+
+@pytest.mark.parametrize("query", [
+    "Compare the market impact of the EU AI Act vs US and assess strategic implications",
+    "Verify the claims in recent AI agent funding announcements and analyze the market trends",
+    "1. Summarize GPU supply in 2026\n2. Forecast prices\n3. Compare vendors",
+])
+def test_analytical_queries_route_to_full_crew(query):
+    assert classify_query(query)["route"] == "hierarchical"
+
+def test_terms_match_whole_words_only():
+    signals = classify_query("define marketing for vsync displays")["signals"]
+    assert not any(s.startswith("analysis") for s in signals)
+
+def test_pros_and_cons_is_not_a_conjunction():
+    result = classify_query("Pros and cons of Rust and Go")
+    assert "2 sub-questions" not in result["signals"]
+
+def test_manual_mode_bypasses_classifier():
+    route = resolve_route({"process_mode": "hierarchical"}, "What is CrewAI?")
+    assert route == {"route": "hierarchical", "score": None, "signals": [], "automatic": False}
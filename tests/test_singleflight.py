@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from src.utils.singleflight import SingleFlight
+
+CALLERS = 8
+
+def _run_concurrently(flight, fn):
+    """Call flight.do("key", fn) from CALLERS threads; return their results or exceptions."""
+    outcomes = [None] * CALLERS
+    barrier = threading.Barrier(CALLERS)
+
+    def caller(i):
+        barrier.wait()
+        try:
+            outcomes[i] = flight.do("key", fn)
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(CALLERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return outcomes
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight("test")
+    executions = []
+
+    def slow():
+        executions.append(1)
+        time.sleep(0.2)
+        return object()
+
+    outcomes = _run_concurrently(flight, slow)
+
+    assert len(executions) == 1
+    assert all(result is outcomes[0] for result in outcomes)
+    assert flight.stats() == {
+        "name": "test",
+        "calls": CALLERS,
+        "executions": 1,
+        "coalesced": CALLERS - 1,
+        "in_flight": 0,
+    }
+
+def test_leader_exception_reaches_every_waiter_and_clears_key():
+    flight = SingleFlight("test")
+
+    def failing():
+        time.sleep(0.2)
+        raise ConnectionError("search failed")
+
+    outcomes = _run_concurrently(flight, failing)
+
+    assert all(isinstance(e, ConnectionError) for e in outcomes)
+    assert flight.stats()["in_flight"] == 0
+    # Nothing is cached: the next call for the key runs again
+    assert flight.do("key", lambda: "ok") == "ok"
+    assert flight.stats()["executions"] == 2
+
+def test_results_are_not_cached_after_completion():
+    flight = SingleFlight("test")
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+    with pytest.raises(ValueError):
+        flight.do("key", lambda: int("x"))